@@ -1,32 +1,34 @@
 import json
 from datetime import datetime
+from coldstore import read_segment
+from money import check_cents, check_credit, format_money
 
 class Account:
-    def __init__(self, account_id, name, balance=0.0, pin=None, mobile=None):
+    """A customer account; balance and all ledger amounts are integer cents"""
+
+    def __init__(self, account_id, name, balance=0, pin=None, mobile=None):
         self.id = account_id
         self.name = name
         self.pin = pin
         self.mobile = mobile
         self.balance = balance
-        self.transactions = []
+        self.transactions = []  # Hot tail of the ledger
+        self.cold_segments = []  # Older entries archived by ColdStorage, oldest first
     
     def deposit(self, amount):
-        """Deposit money into the account"""
+        """Deposit money (in cents) into the account"""
+        check_cents(amount)
         if amount <= 0:
             raise ValueError("Deposit amount must be positive")
+        check_credit(self.balance, amount)
         
         self.balance += amount
-        transaction = {
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "type": "DEPOSIT",
-            "amount": amount,
-            "balance_after": self.balance
-        }
-        self.transactions.append(transaction)
+        self._record("DEPOSIT", amount)
         return self.balance
     
     def withdraw(self, amount):
-        """Withdraw money from the account"""
+        """Withdraw money (in cents) from the account"""
+        check_cents(amount)
         if amount <= 0:
             raise ValueError("Withdrawal amount must be positive")
         
@@ -34,40 +36,60 @@ class Account:
             raise ValueError("Insufficient funds")
         
         self.balance -= amount
+        self._record("WITHDRAWAL", amount)
+        return self.balance
+
+    def _record(self, entry_type, amount, date=None, **details):
+        """Append a ledger entry for a change already applied to the balance"""
         transaction = {
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "type": "WITHDRAWAL",
+            "date": date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "type": entry_type,
             "amount": amount,
+            **details,
             "balance_after": self.balance
         }
         self.transactions.append(transaction)
-        return self.balance
+        return transaction
     
     def get_balance(self):
         """Get current balance"""
         return self.balance
     
     def get_history(self):
-        """Get transaction history"""
-        return self.transactions.copy()
+        """Get transaction history, including entries archived to cold segments"""
+        if not self.cold_segments:
+            return self.transactions.copy()
+        history = []
+        for segment in self.cold_segments:
+            history.extend(read_segment(segment))
+        history.extend(self.transactions)
+        return history
+
+    def history_length(self):
+        """Number of ledger entries, hot and cold, without decompressing anything"""
+        return sum(segment["count"] for segment in self.cold_segments) + len(self.transactions)
+
+    def history_since(self, position):
+        """Ledger entries from a position in the full history onwards.
+
+        Cold segments are only decompressed when the position falls inside them.
+        """
+        cold_count = sum(segment["count"] for segment in self.cold_segments)
+        if position >= cold_count:
+            return self.transactions[position - cold_count:]
+        return self.get_history()[position:]
 
     def change_pin(self, new_pin):
         """Change the account PIN"""
         if not new_pin or len(str(new_pin)) < 4:
             raise ValueError("PIN must be at least 4 digits")
         self.pin = str(new_pin)
-        transaction = {
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "type": "PIN_CHANGE",
-            "amount": 0,
-            "balance_after": self.balance
-        }
-        self.transactions.append(transaction)
+        self._record("PIN_CHANGE", 0)
         return True
     
     def to_dict(self):
         """Convert account object to dictionary for JSON storage"""
-        return {
+        data = {
             "id": self.id,
             "name": self.name,
             "pin": self.pin,
@@ -75,13 +97,17 @@ class Account:
             "balance": self.balance,
             "transactions": self.transactions
         }
+        if self.cold_segments:
+            data["cold_segments"] = self.cold_segments
+        return data
 
     @classmethod
     def from_dict(cls, data):
         """Create account object from dictionary"""
         account = cls(data["id"], data["name"], data["balance"], data.get("pin"), data.get("mobile"))
         account.transactions = data.get("transactions", [])
+        account.cold_segments = data.get("cold_segments", [])
         return account
     
     def __str__(self):
-        return f"Account {self.id}: {self.name} - Balance: ${self.balance:.2f}"
+        return f"Account {self.id}: {self.name} - Balance: {format_money(self.balance)}"
@@ -0,0 +1,93 @@
+class Aggregates:
+    """Reporting totals maintained as entries are posted.
+
+    Keeps, per day and entry type, the number of entries and the sum of
+    their amounts, plus the total of all account balances. Each posting
+    updates them in O(1), so reports never need to scan ledgers.
+    """
+
+    def __init__(self):
+        self.daily = {}  # "YYYY-MM-DD" -> {entry type: [count, total amount]}
+        self.total_assets = 0
+        self.changed_days = set()  # Days updated since the last save, for incremental saves
+
+    def record(self, entry, delta):
+        """Add a posted ledger entry that changed its account balance by ``delta``"""
+        day = entry["date"][:10]
+        totals = self.daily.setdefault(day, {}).setdefault(entry["type"], [0, 0])
+        self.changed_days.add(day)
+        totals[0] += 1
+        totals[1] += entry["amount"]
+        self.total_assets += delta
+
+    def add_account(self, account):
+        """Count the opening balance of a new account"""
+        self.total_assets += account.balance
+
+    def remove_account(self, account):
+        """Stop counting the balance of an account leaving the bank"""
+        self.total_assets -= account.balance
+
+    def day(self, day):
+        """Return {entry type: (count, total)} for one day ("YYYY-MM-DD")"""
+        return {entry_type: tuple(totals) for entry_type, totals in self.daily.get(day, {}).items()}
+
+    def by_type(self, start_day=None, end_day=None):
+        """Return {entry type: (count, total)} over an inclusive range of days.
+
+        Days are "YYYY-MM-DD" strings, or a prefix of one, so "2025-09"
+        as both bounds selects a whole month.
+        """
+        result = {}
+        for day, types in self.daily.items():
+            if start_day is not None and day[:len(start_day)] < start_day:
+                continue
+            if end_day is not None and day[:len(end_day)] > end_day:
+                continue
+            for entry_type, (count, total) in types.items():
+                counts = result.setdefault(entry_type, [0, 0])
+                counts[0] += count
+                counts[1] += total
+        return {entry_type: tuple(totals) for entry_type, totals in result.items()}
+
+    def daily_totals(self, entry_type):
+        """Return {day: (count, total)} for one entry type, in date order"""
+        return {day: tuple(types[entry_type]) for day, types in sorted(self.daily.items())
+                if entry_type in types}
+
+    def to_dict(self):
+        """Copy the aggregates into a dictionary for JSON storage"""
+        daily = {day: {entry_type: list(totals) for entry_type, totals in types.items()}
+                 for day, types in self.daily.items()}
+        return {"daily": daily, "total_assets": self.total_assets}
+
+    def changes(self):
+        """Return the totals of the days changed since the last call, plus total assets, for a journal"""
+        daily = {day: {entry_type: list(totals) for entry_type, totals in self.daily[day].items()}
+                 for day in self.changed_days}
+        self.changed_days.clear()
+        return {"daily": daily, "total_assets": self.total_assets}
+
+    def apply_changes(self, data):
+        """Apply a journal record produced by changes()"""
+        self.daily.update(data["daily"])
+        self.total_assets = data["total_assets"]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create aggregates from a dictionary produced by to_dict"""
+        aggregates = cls()
+        aggregates.daily = data["daily"]
+        aggregates.total_assets = data["total_assets"]
+        return aggregates
+
+    @classmethod
+    def rebuild(cls, accounts):
+        """Recompute the aggregates from full account ledgers"""
+        aggregates = cls()
+        for account in accounts:
+            for entry in account.get_history():
+                aggregates.record(entry, 0)
+            aggregates.add_account(account)
+        aggregates.changed_days.clear()
+        return aggregates
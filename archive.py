@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+from account import Account
+
+
+class AccountArchive:
+    """Closed accounts, kept out of the bank file in an append-only JSONL file.
+
+    Closing an account queues its final state here; the next save appends
+    it to ``<bank file>.archive`` before the account leaves the bank file,
+    so a crash can at worst leave it in both. Lookups use an index of file
+    offsets built on first use, so they read one line.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.pending = []  # Account dicts closed since the last save
+        self._offsets = None  # account_id -> byte offset of its line
+
+    def add(self, account):
+        """Queue a closed account for the next save"""
+        self.pending.append(account.to_dict())
+
+    def flush(self, filename):
+        """Append queued accounts to the archive file"""
+        if filename != self.filename:
+            if self.filename and os.path.exists(self.filename):
+                # Saving the bank under a new name carries its archive along
+                shutil.copyfile(self.filename, filename)
+            self.filename, self._offsets = filename, None
+        count = len(self.pending)
+        if not count:
+            return 0
+        records = self.pending[:count]
+        with open(filename, "ab") as f:
+            for data in records:
+                if self._offsets is not None:
+                    self._offsets[data["id"]] = f.tell()
+                f.write(json.dumps(data).encode("utf-8") + b"\n")
+        # Accounts closed while writing stay queued for the next flush
+        del self.pending[:count]
+        return count
+
+    def _index(self):
+        if self._offsets is None:
+            offsets = {}
+            if self.filename and os.path.exists(self.filename):
+                with open(self.filename, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        try:
+                            offsets[json.loads(line)["id"]] = offset
+                        except ValueError:
+                            break  # Torn write at the end of the file
+                        offset += len(line)
+            self._offsets = offsets
+        return self._offsets
+
+    def get(self, account_id):
+        """Return a closed account as a read-only Account, or None"""
+        for data in reversed(self.pending):
+            if data["id"] == account_id:
+                return Account.from_dict(data)
+        offset = self._index().get(account_id)
+        if offset is None:
+            return None
+        with open(self.filename, "rb") as f:
+            f.seek(offset)
+            return Account.from_dict(json.loads(f.readline()))
+
+    def ids(self):
+        """Return the IDs of all closed accounts"""
+        return list(self._index()) + [data["id"] for data in self.pending]
+
+    def __contains__(self, account_id):
+        return (any(data["id"] == account_id for data in self.pending)
+                or account_id in self._index())
+
+    def __len__(self):
+        return len(self._index()) + len(self.pending)
@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+Discrepancy = namedtuple("Discrepancy", ["account_id", "position", "kind", "detail"])
+
+# Balance effect of each entry type, as a multiplier of the entry amount.
+BALANCE_EFFECT = {
+    "DEPOSIT": 1,
+    "WITHDRAWAL": -1,
+    "PIN_CHANGE": 0,
+    "TRANSFER_OUT": -1,
+    "TRANSFER_IN": 1,
+}
+
+
+def _effect(entry):
+    # Transfers posted before transfer IDs existed were memos next to the
+    # WITHDRAWAL and DEPOSIT entries that actually moved the money
+    if entry["type"] in ("TRANSFER_OUT", "TRANSFER_IN") and "transfer_id" not in entry:
+        return 0
+    return BALANCE_EFFECT.get(entry["type"])
+
+
+class Auditor:
+    """Checks ledger invariants across a bank.
+
+    For every account, each entry's balance_after must equal the previous
+    balance_after plus the entry's effect, no balance may go negative, and
+    the account balance must equal the last balance_after. Across accounts,
+    every TRANSFER_OUT must have a matching TRANSFER_IN. Closed
+    accounts are read from the bank's archive, so transfers with them
+    still match.
+
+    The auditor keeps a watermark per account, so after the first run only
+    entries appended since the previous audit are checked.
+    """
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.reset()
+
+    def reset(self):
+        """Forget all watermarks, so the next audit checks every entry"""
+        self.watermarks = {}  # account_id -> (entries audited, balance after the last one)
+        # Transfer sides still waiting for their counterpart:
+        # (direction, (sender, receiver, amount, transfer ID)) -> [(account_id, position), ...]
+        self._unmatched = {}
+        self._closed_done = set()  # Closed accounts audited to the end; they never change again
+
+    def audit(self, full=False):
+        """Audit the bank and return a list of Discrepancy tuples.
+
+        With ``full`` the watermarks are discarded and every entry is
+        checked again.
+        """
+        if full:
+            self.reset()
+        discrepancies = []
+        with self.bank.lock:
+            for account_id, account in self.bank.accounts.items():
+                self._audit_account(account, discrepancies)
+            closed = self.bank.closed_accounts
+            for account_id in closed.ids():
+                if account_id not in self._closed_done:
+                    self._audit_account(closed.get(account_id), discrepancies)
+                    self._closed_done.add(account_id)
+            for account_id in set(self.watermarks) - set(self.bank.accounts):
+                del self.watermarks[account_id]
+        discrepancies.extend(self._unmatched_transfers())
+        return discrepancies
+
+    def _audit_account(self, account, discrepancies):
+        start, balance = self.watermarks.get(account.id, (0, None))
+        if start > account.history_length():
+            # The ledger was replaced since the last audit; start over for this account
+            start, balance = 0, None
+        entries = account.history_since(start)
+
+        for position, entry in enumerate(entries, start):
+            effect = _effect(entry)
+            if effect is None:
+                discrepancies.append(Discrepancy(account.id, position, "unknown_type",
+                                                 f"Unknown entry type {entry['type']}"))
+                balance = entry["balance_after"]
+                continue
+            expected = None if balance is None else balance + effect * entry["amount"]
+            if expected is not None and entry["balance_after"] != expected:
+                discrepancies.append(Discrepancy(account.id, position, "balance_chain",
+                                                 f"balance_after {entry['balance_after']} != expected {expected}"))
+            if entry["balance_after"] < 0:
+                discrepancies.append(Discrepancy(account.id, position, "negative_balance",
+                                                 f"balance_after {entry['balance_after']} is negative"))
+            balance = entry["balance_after"]
+
+            if entry["type"] == "TRANSFER_OUT":
+                key = (account.id, entry.get("receiver_id"), entry["amount"], entry.get("transfer_id"))
+                self._match("out", key, account.id, position)
+            elif entry["type"] == "TRANSFER_IN":
+                key = (entry.get("sender_id"), account.id, entry["amount"], entry.get("transfer_id"))
+                self._match("in", key, account.id, position)
+
+        if balance is not None and account.balance != balance:
+            discrepancies.append(Discrepancy(account.id, start + len(entries) - 1, "account_balance",
+                                             f"balance {account.balance} != last balance_after {balance}"))
+        self.watermarks[account.id] = (start + len(entries), balance)
+
+    def _match(self, direction, key, account_id, position):
+        other = ("in" if direction == "out" else "out", key)
+        waiting = self._unmatched.get(other)
+        if waiting:
+            waiting.pop(0)
+            if not waiting:
+                del self._unmatched[other]
+        else:
+            self._unmatched.setdefault((direction, key), []).append((account_id, position))
+
+    def _unmatched_transfers(self):
+        discrepancies = []
+        for (direction, (sender, receiver, amount, _)), positions in self._unmatched.items():
+            kind = "unmatched_transfer_out" if direction == "out" else "unmatched_transfer_in"
+            for account_id, position in positions:
+                discrepancies.append(Discrepancy(account_id, position, kind,
+                                                 f"Transfer of {amount} from {sender} to {receiver} has no counterpart"))
+        return discrepancies
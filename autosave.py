@@ -0,0 +1,67 @@
+import threading
+import time
+
+class Autosaver:
+    """Debounced background autosave for a Bank.
+
+    Changes are counted as the bank reports them; a worker thread saves the
+    changed accounts once the bank has been idle for ``idle_seconds`` or once
+    ``max_changes`` changes have piled up, whichever comes first.
+    """
+
+    def __init__(self, bank, filename="bank.json", idle_seconds=2.0, max_changes=20):
+        self.bank = bank
+        self.filename = filename
+        self.idle_seconds = idle_seconds
+        self.max_changes = max_changes
+        self._pending = 0
+        self._last_change = 0.0
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        """Start watching the bank for changes"""
+        self.bank.change_hooks.append(self.notify)
+        self._thread = threading.Thread(target=self._run, name="BankLite autosave", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """Stop the worker thread, saving any outstanding changes first"""
+        if self.notify in self.bank.change_hooks:
+            self.bank.change_hooks.remove(self.notify)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.bank.save_changes(self.filename)
+
+    def notify(self, account_id):
+        """Record a change; called by the bank on the posting thread"""
+        with self._condition:
+            self._pending += 1
+            self._last_change = time.monotonic()
+            if self._pending == 1 or self._pending >= self.max_changes:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopping and self._pending == 0:
+                    self._condition.wait()
+                # Debounce: wait for the bank to go idle unless the batch is full
+                while not self._stopping and self._pending < self.max_changes:
+                    remaining = self._last_change + self.idle_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stopping:
+                    return
+                self._pending = 0
+            try:
+                self.bank.save_changes(self.filename)
+            except OSError as e:
+                print(f"Autosave failed: {e}")
@@ -0,0 +1,111 @@
+import bisect
+import itertools
+
+class BalanceIndex:
+    """Accounts ordered by balance, for range, top-N and percentile queries.
+
+    Entries are (balance, account_id) pairs kept in a list of sorted
+    buckets of at most ``2 * load`` items, with the largest item of each
+    bucket in a separate list. Updates locate the bucket by binary search
+    and then insert or delete within that small bucket, so they cost
+    O(log n + load) instead of the O(n) of one big sorted list.
+    """
+
+    def __init__(self, items=(), load=512):
+        self.load = load
+        items = sorted(items)
+        self._buckets = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(items)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._buckets)
+
+    def add(self, balance, account_id):
+        """Index an account at a balance"""
+        item = (balance, account_id)
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([item])
+            self._maxes.append(item)
+            return
+        index = min(bisect.bisect_left(self._maxes, item), len(self._buckets) - 1)
+        bucket = self._buckets[index]
+        bisect.insort(bucket, item)
+        self._maxes[index] = bucket[-1]
+        if len(bucket) > 2 * self.load:
+            self._buckets[index:index + 1] = [bucket[:self.load], bucket[self.load:]]
+            self._maxes[index:index + 1] = [bucket[self.load - 1], bucket[-1]]
+
+    def remove(self, balance, account_id):
+        """Remove an account indexed at a balance"""
+        item = (balance, account_id)
+        index = bisect.bisect_left(self._maxes, item)
+        if index < len(self._buckets):
+            bucket = self._buckets[index]
+            position = bisect.bisect_left(bucket, item)
+            if position < len(bucket) and bucket[position] == item:
+                del bucket[position]
+                self._len -= 1
+                if bucket:
+                    self._maxes[index] = bucket[-1]
+                else:
+                    del self._buckets[index]
+                    del self._maxes[index]
+                return
+        raise KeyError(item)
+
+    def update(self, account_id, old_balance, new_balance):
+        """Move an account from its old balance to a new one"""
+        if old_balance != new_balance:
+            self.remove(old_balance, account_id)
+            self.add(new_balance, account_id)
+
+    def range(self, low=None, high=None):
+        """Yield (balance, account_id) pairs with low <= balance <= high, lowest first"""
+        if low is None:
+            index, position = 0, 0
+        else:
+            index = bisect.bisect_left(self._maxes, (low,))
+            position = bisect.bisect_left(self._buckets[index], (low,)) if index < len(self._buckets) else 0
+        for bucket in itertools.islice(self._buckets, index, None):
+            for item in itertools.islice(bucket, position, None):
+                if high is not None and item[0] > high:
+                    return
+                yield item
+            position = 0
+
+    def top(self, n):
+        """Return the n highest balances as (balance, account_id) pairs, highest first"""
+        result = []
+        if n <= 0:
+            return result
+        for bucket in reversed(self._buckets):
+            result.extend(reversed(bucket[-(n - len(result)):]))
+            if len(result) >= n:
+                break
+        return result
+
+    def bottom(self, n):
+        """Return the n lowest balances as (balance, account_id) pairs, lowest first"""
+        return list(itertools.islice(self, n))
+
+    def nth(self, k):
+        """Return the k-th lowest (balance, account_id) pair, counting from 0"""
+        if not 0 <= k < self._len:
+            raise IndexError(k)
+        # Walks bucket sizes only, i.e. n / load steps
+        for bucket in self._buckets:
+            if k < len(bucket):
+                return bucket[k]
+            k -= len(bucket)
+
+    def percentile(self, percent):
+        """Return the balance at a percentile (0-100) using the nearest-rank method"""
+        if not self._len:
+            raise ValueError("No accounts indexed")
+        rank = max(1, int(-(-percent * self._len // 100)))
+        return self.nth(min(rank, self._len) - 1)[0]
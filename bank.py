@@ -1,26 +1,223 @@
 import json
+import os
+import threading
+import uuid
+import weakref
+from datetime import datetime
 from account import Account
+from archive import AccountArchive
+from aggregates import Aggregates
+from balance_index import BalanceIndex
+from binfile import BankFile, BinaryAccounts, is_binary_filename
+from events import ACCOUNT_CLOSED, ACCOUNT_CREATED, DEPOSIT, PIN_CHANGED, TRANSFER, WITHDRAWAL, EventStream
+from idempotency import IdempotencyCache
+from money import CENTS_FORMAT, check_cents, check_credit, format_money, migrate_account_dict, migrate_result, to_cents
+from scheduler import StandingOrders
+from snapshot import BankSnapshot
+from velocity import VelocityLimits
 
 class Bank:
     def __init__(self):
         self.accounts = {}  # Use dict instead of list for faster lookups
+        self.dirty = set()  # IDs of accounts changed since the last save
+        self.change_hooks = []  # Callables notified with the account ID after every change
+        self.lock = threading.RLock()  # Guards accounts against background savers
+        self._save_lock = threading.RLock()  # Keeps journal writes ordered with full saves
+        self._journal_records = 0
+        self.cold_storage = None  # Optional ColdStorage used to tier old ledger entries
+        self.idempotency = IdempotencyCache()  # Results of recent requests, by idempotency key
+        self.aggregates = Aggregates()  # Per-day, per-type totals and total assets
+        self._balance_index = None  # Built on first use, then maintained on every posting
+        self.events = EventStream()  # Change-data-capture feed of every mutation
+        self._snapshots = weakref.WeakSet()  # Live BankSnapshots that still need copy-on-write
+        self.standing_orders = StandingOrders(self)  # Recurring transfers, run by standing_orders.tick()
+        self.velocity = VelocityLimits()  # Per-account limits on payments out, none by default
+        self.next_id = 1  # Next account ID; IDs are never reused, even after an account is closed
+        self.closed_accounts = AccountArchive()  # Closed accounts, moved out of accounts
+        self._names = None  # Lowercased name -> account ID, built on first use
+        self._mobiles = None  # Mobile number -> account ID, built with _names
+        self.writer = None  # GroupCommitWriter journaling each change, when one is attached
+        self._journal_group = None  # Records of the operation being run by _atomic
+
+    def _mark_dirty(self, account_id):
+        """Record that an account changed and notify change hooks"""
+        self.dirty.add(account_id)
+        for hook in self.change_hooks:
+            hook(account_id)
+
+    def _before_write(self, account):
+        """Let live snapshots keep an account's state before it is changed; call under the lock"""
+        if self._snapshots:
+            for snapshot in self._snapshots:
+                snapshot._preserve(account)
+
+    def snapshot(self):
+        """Return a consistent, read-only BankSnapshot of the bank as it is now.
+
+        Taking it costs one copy of the account dictionary. The snapshot can
+        be read or saved from another thread while writes continue.
+        """
+        with self.lock:
+            snapshot = BankSnapshot(self.accounts, self._state_to_dict(), self.events.last_seq, self.lock)
+            self._snapshots.add(snapshot)
+        return snapshot
+
+    def _posted(self, account, entry, delta):
+        """Update derived state after a ledger entry that changed the balance by delta"""
+        self.aggregates.record(entry, delta)
+        if self._balance_index is not None:
+            self._balance_index.update(account.id, account.balance - delta, account.balance)
+        if self.writer is not None:
+            record = {"entry": entry, "account_id": account.id, "position": account.history_length() - 1}
+            if entry["type"] == "PIN_CHANGE":
+                record["pin"] = account.pin
+            self._journal(record)
+        self._mark_dirty(account.id)
+
+    def _journal(self, record):
+        """Pass a journal record to the attached writer; call under the lock"""
+        if self.writer is None:
+            return
+        if self._journal_group is not None:
+            self._journal_group.append(record)
+        else:
+            self.writer.submit([record])
+
+    def _atomic(self, operation):
+        """Run an operation whose journal records must be committed together; call under the lock"""
+        writer = self.writer
+        if writer is None or self._journal_group is not None:
+            return operation()
+        self._journal_group = group = []
+        try:
+            return operation()
+        finally:
+            self._journal_group = None
+            if group:
+                writer.submit(group)
+
+    @property
+    def balance_index(self):
+        """BalanceIndex of all accounts, for range, top-N and percentile queries"""
+        with self.lock:
+            if self._balance_index is None:
+                if isinstance(self.accounts, BinaryAccounts):
+                    balances = self.accounts.balances()
+                else:
+                    balances = ((account.id, account.balance) for account in self.accounts.values())
+                self._balance_index = BalanceIndex((balance, account_id) for account_id, balance in balances)
+            return self._balance_index
+
+    def _idempotent(self, key, fingerprint, operation):
+        """Run an operation once per idempotency key, replaying the original result on retries"""
+        if key is None:
+            return operation()
+        with self.lock:
+            found, result = self.idempotency.lookup(key, fingerprint)
+            if found:
+                return result
+            return self._atomic(lambda: self._run_once(key, fingerprint, operation))
+
+    def _run_once(self, key, fingerprint, operation):
+        result = operation()
+        self.idempotency.store(key, fingerprint, result)
+        if self.writer is not None:
+            # Journaled with the operation, so a retry after a crash never runs it twice
+            self._journal({"idempotency": self.idempotency.record(key)})
+        return result
     
-    def create_account(self, name, initial_balance=0.0, pin=None, mobile=None):
+    def create_account(self, name, initial_balance=0, pin=None, mobile=None):
         """Create a new account with a unique ID and check for duplicates"""
-        # Check if account name already exists
-        for account in self.accounts.values():
-            if account.name.lower() == name.lower():
+        check_cents(initial_balance)
+        with self.lock:
+            names, mobiles = self._identity_index()
+            # Check if account name already exists
+            if name.lower() in names:
                 raise ValueError("Account with this name already exists")
-        
-        # Check if mobile number already exists
-        for account in self.accounts.values():
-            if account.mobile == mobile:
+
+            # Check if mobile number already exists
+            if mobile in mobiles:
                 raise ValueError("Account with this mobile number already exists")
-        
-        account_id = len(self.accounts) + 1  # Simple ID generation
-        new_account = Account(account_id, name, initial_balance, pin, mobile)
-        self.accounts[account_id] = new_account
+
+            new_account = Account(self._allocate_id(), name, initial_balance, pin, mobile)
+            self._add_account(new_account)
         return new_account
+
+    def _allocate_id(self):
+        """Return the next unused account ID"""
+        account_id = self.next_id
+        self.next_id += 1
+        return account_id
+
+    def _identity_index(self):
+        """Return the name and mobile indexes of open accounts, building them if needed"""
+        if self._names is None:
+            accounts = list(self.accounts.values())
+            self._names = {account.name.lower(): account.id for account in accounts}
+            self._mobiles = {account.mobile: account.id for account in accounts}
+        return self._names, self._mobiles
+
+    def _add_account(self, account):
+        """Register a new account with the bank"""
+        self.accounts[account.id] = account
+        self.next_id = max(self.next_id, account.id + 1)
+        if self._names is not None:
+            self._names[account.name.lower()] = account.id
+            self._mobiles[account.mobile] = account.id
+        self.aggregates.add_account(account)
+        if self._balance_index is not None:
+            self._balance_index.add(account.balance, account.id)
+        if self.writer is not None:
+            # Copy the ledger, since the writer serializes it later while postings may append to it
+            self._journal({"account": dict(account.to_dict(), transactions=account.transactions.copy())})
+        self._mark_dirty(account.id)
+        self.events.publish(ACCOUNT_CREATED, account.id, name=account.name, balance=account.balance)
+
+    def close_account(self, account_id, pin):
+        """Close an account with a zero balance and move it to the archive.
+
+        Standing orders from or to the account are cancelled, and it leaves
+        every index. It can still be read with find_closed_account, and its
+        ID is never reused.
+        """
+        account = self.authenticate(account_id, pin)
+        if not account:
+            raise ValueError("Authentication failed. Invalid account ID or PIN.")
+        with self.lock:
+            self._require_open(account)
+            if account.balance != 0:
+                raise ValueError("Account balance must be zero to close it")
+            self._atomic(lambda: self._close(account))
+        return True
+
+    def _close(self, account):
+        account_id = account.id
+        self._before_write(account)
+        self.standing_orders.cancel_for_account(account_id)
+        del self.accounts[account_id]
+        self.aggregates.remove_account(account)
+        if self._balance_index is not None:
+            self._balance_index.remove(account.balance, account_id)
+        if self._names is not None:
+            if self._names.get(account.name.lower()) == account_id:
+                del self._names[account.name.lower()]
+            if self._mobiles.get(account.mobile) == account_id:
+                del self._mobiles[account.mobile]
+        self.velocity.forget(account_id)
+        self.closed_accounts.add(account)
+        self._journal({"closed": account_id})
+        self._mark_dirty(account_id)
+        self.events.publish(ACCOUNT_CLOSED, account_id)
+
+    def _require_open(self, *accounts):
+        """Raise if an account looked up before taking the lock was closed since"""
+        for account in accounts:
+            if self.accounts.get(account.id) is not account:
+                raise ValueError("Account not found")
+
+    def find_closed_account(self, account_id):
+        """Find a closed account in the archive; returns a read-only Account or None"""
+        return self.closed_accounts.get(account_id)
     
     def find_account_by_id(self, account_id):
         """Find an account by its ID"""
@@ -37,19 +234,49 @@ class Bank:
             return account
         return None
     
-    def deposit_to_account(self, account_id, amount):
-        """Deposit money to an account"""
+    def deposit_to_account(self, account_id, amount, idempotency_key=None):
+        """Deposit money to an account.
+
+        A retried request with the same idempotency key returns the original
+        balance instead of depositing again.
+        """
+        return self._idempotent(idempotency_key, f"deposit:{account_id}:{amount}",
+                                lambda: self._deposit(account_id, amount))
+
+    def _deposit(self, account_id, amount):
         account = self.find_account_by_id(account_id)
         if account:
-            return account.deposit(amount)
+            with self.lock:
+                self._require_open(account)
+                self._before_write(account)
+                balance = account.deposit(amount)
+                self._posted(account, account.transactions[-1], amount)
+                self.events.publish(DEPOSIT, account_id, amount=amount, balance=balance)
+            return balance
         else:
             raise ValueError("Account not found")
     
-    def withdraw_from_account(self, account_id, amount):
-        """Withdraw money from an account"""
+    def withdraw_from_account(self, account_id, amount, idempotency_key=None):
+        """Withdraw money from an account.
+
+        A retried request with the same idempotency key returns the original
+        balance instead of withdrawing again.
+        """
+        return self._idempotent(idempotency_key, f"withdraw:{account_id}:{amount}",
+                                lambda: self._withdraw(account_id, amount))
+
+    def _withdraw(self, account_id, amount):
         account = self.find_account_by_id(account_id)
         if account:
-            return account.withdraw(amount)
+            with self.lock:
+                self._require_open(account)
+                self.velocity.check(account, "WITHDRAWAL", amount)
+                self._before_write(account)
+                balance = account.withdraw(amount)
+                self.velocity.record(account, "WITHDRAWAL", amount)
+                self._posted(account, account.transactions[-1], -amount)
+                self.events.publish(WITHDRAWAL, account_id, amount=amount, balance=balance)
+            return balance
         else:
             raise ValueError("Account not found")
     
@@ -61,8 +288,20 @@ class Bank:
         else:
             raise ValueError("Account not found")
 
-    def transfer_money(self, sender_id, receiver_id, amount, sender_pin):
-        """Transfer money between accounts"""
+    def transfer_money(self, sender_id, receiver_id, amount, sender_pin, idempotency_key=None):
+        """Transfer money between accounts.
+
+        A retried request with the same idempotency key returns the original
+        balances instead of transferring again.
+        """
+        # Checked before the idempotency lookup, so only the sender can replay a cached result
+        sender, receiver = self._check_transfer(sender_id, receiver_id, amount, sender_pin)
+        return self._idempotent(idempotency_key, f"transfer:{sender_id}:{receiver_id}:{amount}",
+                                lambda: self._transfer(sender, receiver, amount))
+
+    def _check_transfer(self, sender_id, receiver_id, amount, sender_pin):
+        """Validate a transfer request and return the (sender, receiver) accounts"""
+        check_cents(amount)
         if amount <= 0:
             raise ValueError("Transfer amount must be positive")
 
@@ -79,33 +318,54 @@ class Bank:
         # Check if sender and receiver are different
         if sender_id == receiver_id:
             raise ValueError("Cannot transfer to the same account")
+        return sender, receiver
 
-        # Withdraw from sender
-        sender.withdraw(amount)
-
-        # Deposit to receiver
-        receiver.deposit(amount)
-
-        # Log transfer in sender's history
-        sender.transactions.append({
-            "date": sender.transactions[-1]["date"],  # Use the same timestamp as the withdrawal
-            "type": "TRANSFER_OUT",
-            "amount": amount,
-            "receiver_id": receiver_id,
-            "balance_after": sender.balance
-        })
-
-        # Log transfer in receiver's history
-        receiver.transactions.append({
-            "date": receiver.transactions[-1]["date"],  # Use the same timestamp as the deposit
-            "type": "TRANSFER_IN",
-            "amount": amount,
-            "sender_id": sender_id,
-            "balance_after": receiver.balance
-        })
+    def _transfer(self, sender, receiver, amount):
+        with self.lock:
+            self._require_open(sender, receiver)
+            self._post_transfer(sender, receiver, amount)
 
         return sender.balance, receiver.balance
 
+    def _post_transfer(self, sender, receiver, amount, date=None):
+        """Post a validated transfer as one linked entry on each ledger.
+
+        Both entries share a transfer ID and timestamp (``date``, default
+        now). If anything fails part-way, both accounts are restored to
+        their previous state.
+        """
+        if amount > sender.balance:
+            raise ValueError("Insufficient funds")
+        check_credit(receiver.balance, amount)
+        self.velocity.check(sender, "TRANSFER_OUT", amount)
+
+        self._before_write(sender)
+        self._before_write(receiver)
+        transfer_id = uuid.uuid4().hex
+        date = date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sender_state = (sender.balance, len(sender.transactions))
+        receiver_state = (receiver.balance, len(receiver.transactions))
+        try:
+            sender.balance -= amount
+            sender._record("TRANSFER_OUT", amount, date, receiver_id=receiver.id, transfer_id=transfer_id)
+            receiver.balance += amount
+            receiver._record("TRANSFER_IN", amount, date, sender_id=sender.id, transfer_id=transfer_id)
+        except BaseException:
+            sender.balance = sender_state[0]
+            del sender.transactions[sender_state[1]:]
+            receiver.balance = receiver_state[0]
+            del receiver.transactions[receiver_state[1]:]
+            raise
+        self.velocity.record(sender, "TRANSFER_OUT", amount)
+
+        def post():
+            self._posted(sender, sender.transactions[-1], -amount)
+            self._posted(receiver, receiver.transactions[-1], amount)
+        # Both sides reach the journal in the same commit
+        self._atomic(post)
+        self.events.publish(TRANSFER, sender.id, receiver_id=receiver.id, amount=amount, transfer_id=transfer_id,
+                            sender_balance=sender.balance, receiver_balance=receiver.balance)
+
     def change_pin(self, account_id, mobile, new_pin):
         """Change PIN for an account after verifying mobile number"""
         account = self.find_account_by_id(account_id)
@@ -115,25 +375,287 @@ class Bank:
         if account.mobile != mobile:
             raise ValueError("Mobile number does not match account details")
 
-        account.change_pin(new_pin)
+        with self.lock:
+            self._require_open(account)
+            self._before_write(account)
+            account.change_pin(new_pin)
+            self._posted(account, account.transactions[-1], 0)
+            self.events.publish(PIN_CHANGED, account_id)
         return True
 
+    def set_velocity_rule(self, rule):
+        """Add a velocity rule, replacing any rule with the same name"""
+        with self.lock:
+            self.velocity.set_rule(rule)
+            self._journal({"state": {"velocity_rules": self.velocity.to_list()}})
+
+    def remove_velocity_rule(self, name):
+        """Remove the velocity rule with a given name"""
+        with self.lock:
+            self.velocity.remove_rule(name)
+            self._journal({"state": {"velocity_rules": self.velocity.to_list()}})
+
+    def compact_history(self, now=None):
+        """Move old ledger entries of every account into cold segments"""
+        if self.cold_storage is None:
+            return 0
+        moved = 0
+        with self.lock:
+            for account in self.accounts.values():
+                self._before_write(account)
+                count = self.cold_storage.archive(account, now)
+                if count:
+                    moved += count
+                    self._mark_dirty(account.id)
+        return moved
+
     def save_to_file(self, filename="bank.json"):
-        """Save all accounts to a JSON file"""
-        with open(filename, 'w') as f:
-            json.dump([account.to_dict() for account in self.accounts.values()], f)
-    
+        """Save all accounts to a JSON file (or a binary file for a .bkl name).
+
+        The file is written from a snapshot, so operations can continue
+        while it is being serialized; changes made meanwhile stay dirty
+        for the next save.
+        """
+        with self._save_lock:
+            with self.lock:
+                if self.cold_storage is not None and self.cold_storage.directory is None:
+                    self.cold_storage.directory = filename + ".cold"
+                # Tier old history first so full rewrites only carry the hot tail
+                self.compact_history()
+                snapshot = self.snapshot()
+                dirty, pending = set(self.dirty), list(self.idempotency.pending)
+                orders = set(self.standing_orders.dirty)
+                days = set(self.aggregates.changed_days)
+                rules = self.velocity.dirty
+                self.velocity.dirty = False
+                self.dirty.clear()
+                self.idempotency.pending.clear()
+                self.standing_orders.dirty.clear()
+                self.aggregates.changed_days.clear()
+            try:
+                # Closed accounts reach the archive before they leave the bank file
+                self.closed_accounts.flush(filename + ".archive")
+                snapshot.save_to_file(filename)
+            except BaseException:
+                with self.lock:
+                    self.dirty |= dirty
+                    self.idempotency.pending[:0] = pending
+                    self.standing_orders.dirty |= orders
+                    self.aggregates.changed_days |= days
+                    self.velocity.dirty = self.velocity.dirty or rules
+                raise
+            # The full file now contains every change up to the snapshot, so the journal is obsolete
+            if os.path.exists(filename + ".journal"):
+                os.remove(filename + ".journal")
+            self._journal_records = 0
+
+    def _state_to_dict(self):
+        """Bank-level state saved alongside the accounts"""
+        return {"idempotency": self.idempotency.to_list(), "aggregates": self.aggregates.to_dict(),
+                "event_seq": self.events.last_seq, "standing_orders": self.standing_orders.to_dict(),
+                "velocity_rules": self.velocity.to_list(), "next_id": self.next_id}
+
+    def _load_state(self, state, fmt=CENTS_FORMAT):
+        """Restore bank-level state written by _state_to_dict"""
+        records = state.get("idempotency", [])
+        if fmt < CENTS_FORMAT:
+            # Fingerprints end with the request amount, which also moves to cents
+            records = [[key, timestamp, f"{fingerprint.rpartition(':')[0]}:{to_cents(fingerprint.rpartition(':')[2])}",
+                        migrate_result(result)]
+                       for key, timestamp, fingerprint, result in records]
+        self.idempotency.load(records)
+        if "aggregates" in state:
+            self.aggregates = Aggregates.from_dict(state["aggregates"])
+        if "aggregate_changes" in state and self.aggregates is not None:
+            # Without saved aggregates to update, _finish_load rebuilds them from the ledgers
+            self.aggregates.apply_changes(state["aggregate_changes"])
+        if "event_seq" in state:
+            self.events.resume(state["event_seq"])
+        if "standing_orders" in state:
+            self.standing_orders.load(state["standing_orders"])
+        if "velocity_rules" in state:
+            self.velocity.load(state["velocity_rules"])
+        if "next_id" in state:
+            self.next_id = state["next_id"]
+
+    def _journal_limit(self):
+        """Journal length, in records, beyond which it is compacted into a full save; call under the lock"""
+        return max(len(self.accounts) + len(self.standing_orders), 64)
+
+    def save_changes(self, filename="bank.json"):
+        """Persist only the accounts changed since the last save.
+
+        Changed accounts and standing orders are appended to a journal next to the main file,
+        which is replayed by load_from_file. Once the journal grows larger
+        than the bank itself it is compacted into a full save.
+        """
+        with self._save_lock:
+            with self.lock:
+                orders = self.standing_orders
+                if not self.dirty and not orders.dirty and not self.velocity.dirty:
+                    return 0
+                count = len(self.dirty) + len(orders.dirty) + self.velocity.dirty
+                compact = self._journal_records + count > self._journal_limit()
+                if not compact:
+                    lines = [json.dumps({"format": CENTS_FORMAT, "account": self.accounts[account_id].to_dict()})
+                             if account_id in self.accounts else json.dumps({"format": CENTS_FORMAT, "closed": account_id})
+                             for account_id in self.dirty]
+                    records = [self.idempotency.record(key) for key in self.idempotency.pending]
+                    lines.extend(json.dumps({"format": CENTS_FORMAT, "idempotency": record})
+                                 for record in records if record)
+                    lines.extend(json.dumps({"format": CENTS_FORMAT, **orders.record(order_id)})
+                                 for order_id in orders.dirty)
+                    # Only the days posted to since the last save, so the line stays small
+                    state = {"aggregate_changes": self.aggregates.changes(), "event_seq": self.events.last_seq,
+                             "next_id": self.next_id}
+                    if self.velocity.dirty:
+                        state["velocity_rules"] = self.velocity.to_list()
+                    lines.append(json.dumps({"format": CENTS_FORMAT, "state": state}))
+                    self.dirty.clear()
+                    self.idempotency.pending.clear()
+                    orders.dirty.clear()
+                    self.velocity.dirty = False
+                    self._journal_records += len(lines)
+            if compact:
+                self.save_to_file(filename)
+                return count
+            # Serialize under the lock, but write outside it so posting never waits on disk
+            self.closed_accounts.flush(filename + ".archive")
+            with open(filename + ".journal", 'a') as f:
+                f.write("".join(line + "\n" for line in lines))
+            return len(lines)
+
     def load_from_file(self, filename="bank.json"):
-        """Load accounts from a JSON file"""
+        """Load accounts from a JSON file (or a binary file for a .bkl name)"""
+        if is_binary_filename(filename):
+            return self.load_from_binary(filename)
+        self.aggregates = None
+        self.next_id = None
+        self.closed_accounts = AccountArchive(filename + ".archive")
         try:
             with open(filename, 'r') as f:
-                accounts_data = json.load(f)
-                self.accounts = {data["id"]: Account.from_dict(data) for data in accounts_data}
+                data = json.load(f)
+            # Files written before bank-level state existed hold a bare list of accounts
+            if isinstance(data, list):
+                data = {"accounts": data}
+            # Files without a format version store float dollars; convert them to cents
+            fmt = data.get("format", 1)
+            accounts_data = data["accounts"]
+            if fmt < CENTS_FORMAT:
+                accounts_data = [migrate_account_dict(account_data) for account_data in accounts_data]
+            self.accounts = {account_data["id"]: Account.from_dict(account_data)
+                             for account_data in accounts_data}
+            self._load_state(data, fmt)
+        except FileNotFoundError:
+            print("File not found. Starting with an empty bank.")
+        self._replay_journal(filename + ".journal")
+        self._finish_load()
+
+    def load_from_binary(self, filename):
+        """Open a binary bank file read-mostly.
+
+        The file is memory-mapped and accounts are decoded on first access,
+        so startup time does not depend on the size of the bank.
+        """
+        self.aggregates = None
+        self.next_id = None
+        self.closed_accounts = AccountArchive(filename + ".archive")
+        try:
+            bank_file = BankFile(filename)
+            self.accounts = BinaryAccounts(bank_file, Account)
+            self._load_state(bank_file.meta(), bank_file.format)
         except FileNotFoundError:
             print("File not found. Starting with an empty bank.")
+        self._replay_journal(filename + ".journal")
+        self._finish_load()
+
+    def _finish_load(self):
+        """Rebuild derived state that was not saved with the bank"""
+        if self.aggregates is None:
+            self.aggregates = Aggregates.rebuild(self.accounts.values())
+        if self.next_id is None:
+            # Files from before the allocator never closed accounts, so IDs above the largest are free
+            self.next_id = max(self.accounts, default=0) + 1
+        self._balance_index = None
+        self._names = self._mobiles = None
+        self.aggregates.changed_days.clear()
+        self.velocity.dirty = False
+        self.dirty.clear()
+        self.idempotency.pending.clear()
+        self.standing_orders.dirty.clear()
+
+    def _replay_journal(self, journal_filename):
+        """Apply incremental saves recorded after the last full save"""
+        self._journal_records = 0
+        try:
+            with open(journal_filename, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of the journal
+                    fmt = record.get("format", 1)
+                    # A GroupCommitWriter writes each commit as one line, so a torn commit is dropped whole
+                    for item in record.get("batch", (record,)):
+                        self._replay_record(item, fmt)
+                        self._journal_records += 1
+        except FileNotFoundError:
+            pass
+
+    def _replay_record(self, record, fmt):
+        """Apply one journal record"""
+        if "account" in record:
+            data = record["account"]
+            if fmt < CENTS_FORMAT:
+                data = migrate_account_dict(data)
+            account = Account.from_dict(data)
+            if self.aggregates is not None:
+                # Writer records carry no totals, so keep them in step here
+                if data["id"] in self.accounts:
+                    self.aggregates.remove_account(self.accounts[data["id"]])
+                self.aggregates.add_account(account)
+            self.accounts[data["id"]] = account
+            if self.next_id is not None:
+                self.next_id = max(self.next_id, data["id"] + 1)
+        elif "entry" in record:
+            self._replay_entry(record)
+        elif "idempotency" in record:
+            self._load_state({"idempotency": [record["idempotency"]]}, fmt)
+        elif "closed" in record:
+            account = self.accounts.pop(record["closed"], None)
+            if account is not None and self.aggregates is not None:
+                self.aggregates.remove_account(account)
+        elif "standing_order" in record:
+            self.standing_orders.apply(record)
+        elif "state" in record:
+            self._load_state(record["state"], fmt)
+        elif "aggregates" in record:
+            self.aggregates = Aggregates.from_dict(record["aggregates"])
+
+    def _replay_entry(self, record):
+        """Apply one ledger entry written by a GroupCommitWriter.
+
+        The entry is only appended at the position it was posted at, so
+        entries already contained in a later account record are skipped.
+        """
+        account = self.accounts.get(record["account_id"])
+        if account is None or account.history_length() != record["position"]:
+            return
+        entry = record["entry"]
+        delta = entry["balance_after"] - account.balance
+        account.transactions.append(entry)
+        account.balance = entry["balance_after"]
+        if "pin" in record:
+            account.pin = record["pin"]
+        if self.aggregates is not None:
+            self.aggregates.record(entry, delta)
+        self.accounts[account.id] = account
     
     def run(self):
         """Run the console menu for the banking system"""
+        from autosave import Autosaver
+        autosaver = Autosaver(self)
+        autosaver.start()
         while True:
             print("\nWelcome to BankLite!")
             print("1. Create Account")
@@ -146,7 +668,7 @@ class Bank:
 
             if choice == '1':
                 name = input("Enter account holder's name: ")
-                initial_balance = float(input("Enter initial balance: "))
+                initial_balance = to_cents(input("Enter initial balance: "))
                 pin = input("Set a PIN for the account: ")
                 account = self.create_account(name, initial_balance, pin)
                 print(f"Account created: {account}")
@@ -157,9 +679,9 @@ class Bank:
                 pin = input("Enter PIN: ")
                 account = self.authenticate(account_id, pin)
                 if account:
-                    amount = float(input("Enter amount to deposit: "))
+                    amount = to_cents(input("Enter amount to deposit: "))
                     new_balance = self.deposit_to_account(account_id, amount)
-                    print(f"New balance: ${new_balance:.2f}")
+                    print(f"New balance: {format_money(new_balance)}")
                 input("Press Enter to return to the menu...")
 
             elif choice == '3':
@@ -167,9 +689,9 @@ class Bank:
                 pin = input("Enter PIN: ")
                 account = self.authenticate(account_id, pin)
                 if account:
-                    amount = float(input("Enter amount to withdraw: "))
+                    amount = to_cents(input("Enter amount to withdraw: "))
                     new_balance = self.withdraw_from_account(account_id, amount)
-                    print(f"New balance: ${new_balance:.2f}")
+                    print(f"New balance: {format_money(new_balance)}")
                 input("Press Enter to return to the menu...")
 
             elif choice == '4':
@@ -192,6 +714,7 @@ class Bank:
                 input("Press Enter to return to the menu...")
 
             elif choice == '6':
+                autosaver.stop(flush=False)
                 self.save_to_file()
                 print("Data saved. Exiting...")
                 break
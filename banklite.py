@@ -1,7 +1,11 @@
 import json
 from datetime import datetime
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+
+def _load_tkinter():
+    """Import Tkinter on first use so the console menu runs without a display"""
+    global tk, ttk, messagebox, simpledialog
+    import tkinter as tk
+    from tkinter import ttk, messagebox, simpledialog
 
 class Account:
     def __init__(self, account_id, name, balance=0.0, pin=None, mobile=None):
@@ -288,6 +292,7 @@ class Bank:
 
 class BankLiteGUI:
     def __init__(self, root):
+        _load_tkinter()
         self.root = root
         self.root.title("BankLite - Banking System")
         self.root.geometry("600x600")
@@ -542,6 +547,7 @@ class BankLiteGUI:
         self.root.quit()
 
 if __name__ == "__main__":
+    _load_tkinter()
     root = tk.Tk()
     app = BankLiteGUI(root)
     root.mainloop()
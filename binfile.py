@@ -0,0 +1,250 @@
+import json
+import mmap
+import os
+import struct
+from collections.abc import MutableMapping
+from money import CENTS_FORMAT, migrate_entry, to_cents
+
+# File layout (all integers little-endian):
+#   header | account table | string heap | ledger segments | meta blob
+# The account table has one fixed-width slot per ID from base_id to
+# base_id + slot_count - 1, so any account is found with a single offset
+# computation instead of a search.
+MAGIC = b"BKLT"
+VERSION = 3
+BINARY_SUFFIX = ".bkl"
+
+HEADER = struct.Struct("<4sHxxqqqQQQQ")
+# present, id, balance, then (offset, length) for name, mobile, pin and ledger.
+# Version 1 stored the balance as a float of dollars, version 2 as integer cents;
+# both also held an unused 32-byte PIN hash after the balance, dropped in version 3.
+SLOTS = {
+    1: struct.Struct("<?qd32sQIQIQIQQ"),
+    2: struct.Struct("<?qq32sQIQIQIQQ"),
+    3: struct.Struct("<?qqQIQIQIQQ"),
+}
+SLOT = SLOTS[VERSION]
+NONE_LENGTH = 0xFFFFFFFF  # String length marking a missing (None) value
+
+# Account fields stored in the table and heap; everything else goes into the ledger segment
+HEADER_FIELDS = ("id", "name", "pin", "mobile", "balance")
+
+
+def is_binary_filename(filename):
+    """Return True if a bank file name refers to the binary format"""
+    return str(filename).endswith(BINARY_SUFFIX)
+
+
+class BankFile:
+    """Read-only, memory-mapped view of a binary bank file"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.base_id, self.slot_count, self.count, self.table_offset,
+         self.meta_offset, self.meta_length, _) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a BankLite binary file")
+        if version not in SLOTS:
+            raise ValueError(f"Unsupported bank file version: {version}")
+        self._slot_struct = SLOTS[version]
+        self._version = version
+        # Storage format of the amounts, as used for JSON files
+        self.format = CENTS_FORMAT if version >= 2 else 1
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, account_id):
+        return self._slot(account_id) is not None
+
+    def close(self):
+        """Release the memory map and file handle"""
+        self._map.close()
+        self._file.close()
+
+    def _slot(self, account_id):
+        if not isinstance(account_id, int):
+            return None
+        index = account_id - self.base_id
+        if index < 0 or index >= self.slot_count:
+            return None
+        slot = self._slot_struct.unpack_from(self._map, self.table_offset + index * self._slot_struct.size)
+        if not slot[0]:
+            return None
+        return slot if self._version >= 3 else slot[:3] + slot[4:]
+
+    def _string(self, offset, length):
+        if length == NONE_LENGTH:
+            return None
+        return self._map[offset:offset + length].decode("utf-8")
+
+    def ids(self):
+        """Iterate over the IDs of all stored accounts in ascending order"""
+        for index in range(self.slot_count):
+            if self._map[self.table_offset + index * self._slot_struct.size]:
+                yield self.base_id + index
+
+    def header(self, account_id):
+        """Return the table fields of an account without decoding its ledger"""
+        slot = self._slot(account_id)
+        if slot is None:
+            raise KeyError(account_id)
+        _, _, balance, name_off, name_len, mobile_off, mobile_len, pin_off, pin_len, _, _ = slot
+        return {
+            "id": account_id,
+            "name": self._string(name_off, name_len),
+            "pin": self._string(pin_off, pin_len),
+            "mobile": self._string(mobile_off, mobile_len),
+            "balance": balance if self.format >= CENTS_FORMAT else to_cents(balance),
+        }
+
+    def ledger(self, account_id):
+        """Decode the ledger segment of an account"""
+        slot = self._slot(account_id)
+        if slot is None:
+            raise KeyError(account_id)
+        offset, length = slot[9], slot[10]
+        return json.loads(self._map[offset:offset + length])
+
+    def account_dict(self, account_id):
+        """Return an account in the same dictionary form as Account.to_dict"""
+        data = self.header(account_id)
+        data.update(self.ledger(account_id))
+        if self.format < CENTS_FORMAT:
+            data["transactions"] = [migrate_entry(entry) for entry in data.get("transactions", [])]
+        return data
+
+    def meta(self):
+        """Decode the bank-level metadata blob"""
+        return json.loads(self._map[self.meta_offset:self.meta_offset + self.meta_length])
+
+
+def write_bank_file(filename, accounts_data, meta=None):
+    """Write account dictionaries (as produced by Account.to_dict) to a binary bank file"""
+    accounts_data = sorted(accounts_data, key=lambda data: data["id"])
+    base_id = accounts_data[0]["id"] if accounts_data else 1
+    slot_count = accounts_data[-1]["id"] - base_id + 1 if accounts_data else 0
+    table_offset = HEADER.size
+    heap_offset = table_offset + slot_count * SLOT.size
+
+    heap = bytearray()
+    slots = bytearray(slot_count * SLOT.size)
+
+    def put(value):
+        if value is None:
+            return heap_offset, NONE_LENGTH
+        encoded = str(value).encode("utf-8")
+        offset = heap_offset + len(heap)
+        heap.extend(encoded)
+        return offset, len(encoded)
+
+    ledgers = []
+    for data in accounts_data:
+        name = put(data["name"])
+        mobile = put(data.get("mobile"))
+        pin = put(data.get("pin"))
+        ledger = {key: value for key, value in data.items() if key not in HEADER_FIELDS}
+        ledgers.append(json.dumps(ledger, separators=(",", ":")).encode("utf-8"))
+        SLOT.pack_into(slots, (data["id"] - base_id) * SLOT.size, True, data["id"],
+                       data["balance"], name[0], name[1], mobile[0], mobile[1], pin[0], pin[1], 0, 0)
+
+    # Ledger segments follow the heap; patch their offsets into the slots
+    offset = heap_offset + len(heap)
+    for data, ledger in zip(accounts_data, ledgers):
+        position = (data["id"] - base_id) * SLOT.size + SLOT.size - 16
+        struct.pack_into("<QQ", slots, position, offset, len(ledger))
+        offset += len(ledger)
+
+    meta_blob = json.dumps(meta or {}).encode("utf-8")
+    header = HEADER.pack(MAGIC, VERSION, base_id, slot_count, len(accounts_data),
+                         table_offset, offset, len(meta_blob), 0)
+
+    # Write next to the target and swap in, so open memory maps of the old file stay valid
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, "wb") as f:
+        f.write(header)
+        f.write(slots)
+        f.write(heap)
+        for ledger in ledgers:
+            f.write(ledger)
+        f.write(meta_blob)
+    os.replace(temp_filename, filename)
+
+
+class BinaryAccounts(MutableMapping):
+    """Accounts dictionary backed by a BankFile.
+
+    Accounts are decoded on first access and kept in memory from then on,
+    so opening a large bank costs nothing until accounts are actually used.
+    """
+
+    def __init__(self, bank_file, account_class):
+        self.bank_file = bank_file
+        self.account_class = account_class
+        self._loaded = {}
+        self._removed = set()
+
+    def __getitem__(self, account_id):
+        account = self._loaded.get(account_id)
+        if account is None:
+            if account_id in self._removed or account_id not in self.bank_file:
+                raise KeyError(account_id)
+            account = self.account_class.from_dict(self.bank_file.account_dict(account_id))
+            self._loaded[account_id] = account
+        return account
+
+    def __setitem__(self, account_id, account):
+        self._removed.discard(account_id)
+        self._loaded[account_id] = account
+
+    def __delitem__(self, account_id):
+        if account_id not in self:
+            raise KeyError(account_id)
+        self._loaded.pop(account_id, None)
+        self._removed.add(account_id)
+
+    def __contains__(self, account_id):
+        if account_id in self._loaded:
+            return True
+        return account_id not in self._removed and account_id in self.bank_file
+
+    def __iter__(self):
+        for account_id in self.bank_file.ids():
+            if account_id not in self._removed:
+                yield account_id
+        for account_id in list(self._loaded):
+            if account_id not in self.bank_file:
+                yield account_id
+
+    def balances(self):
+        """Yield (account_id, balance) pairs, reading unloaded balances from the table only"""
+        for account_id in self:
+            account = self._loaded.get(account_id)
+            if account is not None:
+                yield account_id, account.balance
+            else:
+                yield account_id, self.bank_file.header(account_id)["balance"]
+
+    def __len__(self):
+        removed = sum(1 for account_id in self._removed if account_id in self.bank_file)
+        # A copy, since lookups decode accounts into _loaded without the bank lock
+        added = sum(1 for account_id in list(self._loaded) if account_id not in self.bank_file)
+        return self.bank_file.count - removed + added
+
+
+def json_to_binary(json_filename, binary_filename):
+    """Convert a bank.json file (and its journal) to the binary format"""
+    from bank import Bank
+    bank = Bank()
+    bank.load_from_file(json_filename)
+    bank.save_to_file(binary_filename)
+
+
+def binary_to_json(binary_filename, json_filename):
+    """Convert a binary bank file (and its journal) back to the JSON format"""
+    from bank import Bank
+    bank = Bank()
+    bank.load_from_binary(binary_filename)
+    bank.save_to_file(json_filename)
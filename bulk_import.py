@@ -0,0 +1,160 @@
+import csv
+import json
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from account import Account
+from money import MAX_CENTS, to_cents
+
+ImportResult = namedtuple("ImportResult", ["imported", "rejected"])
+
+# Column names accepted for each account field, in order of preference
+FIELD_ALIASES = {
+    "name": ("name",),
+    "initial_balance": ("initial_balance", "balance"),
+    "pin": ("pin",),
+    "mobile": ("mobile",),
+}
+
+
+def _detect_format(filename):
+    return "jsonl" if filename.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _read_rows(filename, fmt):
+    """Yield (line number, raw row) pairs without loading the whole file"""
+    with open(filename, "r", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_number, line.rstrip("\n")
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate_row(raw, fmt):
+    """Return (fields, None) for a valid row or (None, reason) for a rejected one"""
+    if fmt == "jsonl":
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return None, "Invalid JSON"
+        if not isinstance(raw, dict):
+            return None, "Row must be a JSON object"
+
+    fields = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((raw[alias] for alias in aliases if raw.get(alias) not in (None, "")), None)
+        fields[field] = value.strip() if isinstance(value, str) else value
+
+    if not fields["name"]:
+        return None, "Name is required"
+    if not isinstance(fields["name"], str):
+        return None, "Name must be text"
+    if not fields["mobile"]:
+        return None, "Mobile number is required"
+    if not fields["pin"]:
+        return None, "PIN is required"
+    # JSON may give digits as numbers, but nothing else converts sensibly to text
+    for field, label in (("mobile", "Mobile number"), ("pin", "PIN")):
+        if isinstance(fields[field], bool) or not isinstance(fields[field], (str, int)):
+            return None, f"{label} must be text or digits"
+    fields["mobile"] = str(fields["mobile"])
+    fields["pin"] = str(fields["pin"])
+    try:
+        fields["initial_balance"] = to_cents(fields["initial_balance"] or 0)
+    except ValueError:
+        return None, "Initial balance must be a number"
+    if fields["initial_balance"] < 0:
+        return None, "Initial balance must not be negative"
+    if fields["initial_balance"] > MAX_CENTS:
+        return None, "Initial balance is too large"
+    return fields, None
+
+
+def _validate_chunk(chunk, fmt):
+    """Validate a chunk of rows; runs in a worker process"""
+    return [(line_number, raw, *_validate_row(raw, fmt)) for line_number, raw in chunk]
+
+
+def import_accounts(bank, filename, fmt=None, reject_filename=None, save_filename=None,
+                    chunk_size=10000, workers=None):
+    """Stream accounts from a CSV or JSONL file into the bank.
+
+    Rows are validated in parallel chunks by a process pool, then checked
+    in file order against the same name and mobile uniqueness rules as
+    Bank.create_account. Only a bounded number of chunks are in flight at
+    once, so memory use does not grow with the size of the input. Rejected
+    rows are written to ``reject_filename`` with a reason, and the bank is
+    saved once at the end if ``save_filename`` is given. Pass ``workers=0``
+    to validate on the calling thread.
+    """
+    fmt = fmt or _detect_format(filename)
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported import format: {fmt}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with bank.lock:
+        # The bank keeps these indexes up to date as accounts are added
+        names, mobiles = bank._identity_index()
+
+    imported = rejected = 0
+    reject_file = open(reject_filename, "w", newline="") if reject_filename else None
+    reject_writer = csv.writer(reject_file) if reject_file else None
+    if reject_writer:
+        reject_writer.writerow(["line", "reason", "row"])
+
+    def commit(results):
+        nonlocal imported, rejected
+        with bank.lock:
+            for line_number, raw, fields, reason in results:
+                if fields is not None:
+                    if fields["name"].lower() in names:
+                        reason = "Account with this name already exists"
+                    elif fields["mobile"] in mobiles:
+                        reason = "Account with this mobile number already exists"
+                if reason:
+                    rejected += 1
+                    if reject_writer:
+                        reject_writer.writerow([line_number, reason, raw if isinstance(raw, str) else json.dumps(raw)])
+                    continue
+                bank._add_account(Account(bank._allocate_id(), fields["name"], fields["initial_balance"],
+                                          fields["pin"], fields["mobile"]))
+                imported += 1
+
+    try:
+        chunks = _chunks(_read_rows(filename, fmt), chunk_size)
+        if workers == 0:
+            for chunk in chunks:
+                commit(_validate_chunk(chunk, fmt))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = deque()
+                for chunk in chunks:
+                    in_flight.append(executor.submit(_validate_chunk, chunk, fmt))
+                    # Commit in file order, keeping at most two chunks per worker queued
+                    if len(in_flight) >= workers * 2:
+                        commit(in_flight.popleft().result())
+                while in_flight:
+                    commit(in_flight.popleft().result())
+    finally:
+        if reject_file:
+            reject_file.close()
+
+    if save_filename:
+        bank.save_to_file(save_filename)
+    return ImportResult(imported, rejected)
@@ -0,0 +1,419 @@
+"""Headless command-line interface for BankLite.
+
+Usage examples:
+    python cli.py create "Alice" --balance 100 --pin 1234 --mobile 5550001
+    python cli.py deposit 1 50 --pin 1234
+    python cli.py transfer 1 2 25 --pin 1234
+    python cli.py history 1 --pin 1234
+    python cli.py batch < commands.txt
+
+Nothing here imports Tkinter, and heavier modules (process pools for
+import/export) are only imported by the commands that need them, so
+scripted runs start quickly.
+"""
+import argparse
+import shlex
+import sys
+import time
+from datetime import datetime
+from bank import Bank
+from money import format_money, to_cents
+from scheduler import DAY
+
+# (max_latency seconds, max_batch) pairs timed by the bench command's group-commit rows
+WRITER_SETTINGS = [(0, 1), (0.001, 16), (0.005, 256), (0.02, 4096)]
+
+LIMIT_TYPES = {
+    "all": ("WITHDRAWAL", "TRANSFER_OUT"),
+    "withdrawals": ("WITHDRAWAL",),
+    "transfers": ("TRANSFER_OUT",),
+}
+
+
+def _authenticate(bank, args, account_id=None):
+    account = bank.authenticate(args.account_id if account_id is None else account_id, args.pin)
+    if not account:
+        raise ValueError("Authentication failed. Invalid account ID or PIN.")
+    return account
+
+
+def cmd_create(bank, args):
+    account = bank.create_account(args.name, args.balance, args.pin, args.mobile)
+    print(f"Account created: {account}")
+    return True
+
+
+def cmd_deposit(bank, args):
+    _authenticate(bank, args)
+    balance = bank.deposit_to_account(args.account_id, args.amount, idempotency_key=args.key)
+    print(f"New balance: {format_money(balance)}")
+    return True
+
+
+def cmd_withdraw(bank, args):
+    _authenticate(bank, args)
+    balance = bank.withdraw_from_account(args.account_id, args.amount, idempotency_key=args.key)
+    print(f"New balance: {format_money(balance)}")
+    return True
+
+
+def cmd_transfer(bank, args):
+    sender_balance, receiver_balance = bank.transfer_money(
+        args.sender_id, args.receiver_id, args.amount, args.pin, idempotency_key=args.key)
+    print(f"Transfer successful. Sender balance: {format_money(sender_balance)}, "
+          f"receiver balance: {format_money(receiver_balance)}")
+    return True
+
+
+def cmd_order(bank, args):
+    _authenticate(bank, args, args.sender_id)
+    first_due = datetime.strptime(args.start, "%Y-%m-%d").timestamp() if args.start else None
+    order = bank.standing_orders.add(args.sender_id, args.receiver_id, args.amount, args.days * DAY,
+                                     first_due=first_due, count=args.count)
+    print(f"Standing order {order.id} created")
+    return True
+
+
+def cmd_orders(bank, args):
+    _authenticate(bank, args)
+    for order in bank.standing_orders.for_account(args.account_id):
+        due = datetime.fromtimestamp(order.next_due).strftime("%Y-%m-%d %H:%M:%S")
+        left = "" if order.remaining is None else f", {order.remaining} left"
+        print(f"Order {order.id}: {format_money(order.amount)} from {order.sender_id} to {order.receiver_id} "
+              f"every {order.interval / DAY:g} days, next {due}{left}")
+    return False
+
+
+def cmd_cancel_order(bank, args):
+    order = bank.standing_orders.orders.get(args.order_id)
+    if not order:
+        raise ValueError("Standing order not found")
+    _authenticate(bank, args, order.sender_id)
+    bank.standing_orders.cancel(args.order_id)
+    print(f"Standing order {args.order_id} cancelled")
+    return True
+
+
+def cmd_tick(bank, args):
+    result = bank.standing_orders.tick()
+    print(f"Executed {result.executed} standing orders, retrying {result.retried}, skipped {result.skipped}")
+    return True
+
+
+def cmd_limit(bank, args):
+    from velocity import VelocityRule
+    if args.remove:
+        bank.remove_velocity_rule(args.name)
+        print(f"Velocity rule '{args.name}' removed")
+    else:
+        bank.set_velocity_rule(VelocityRule(args.name, args.hours * 60 * 60, args.count, args.amount,
+                                            LIMIT_TYPES[args.applies_to]))
+        print(f"Velocity rule '{args.name}' set")
+    return True
+
+
+def cmd_close(bank, args):
+    bank.close_account(args.account_id, args.pin)
+    print(f"Account {args.account_id} closed")
+    return True
+
+
+def cmd_closed(bank, args):
+    account = bank.find_closed_account(args.account_id)
+    if not account or account.pin != args.pin:
+        raise ValueError("Authentication failed. Invalid closed account ID or PIN.")
+    print(f"{account} (closed)")
+    for t in account.get_history():
+        print(f"{t['date']} - {t['type']}: {format_money(t['amount'])} (Balance: {format_money(t['balance_after'])})")
+    return False
+
+
+def cmd_balance(bank, args):
+    account = _authenticate(bank, args)
+    print(bank.show_account_details(account.id))
+    return False
+
+
+def cmd_history(bank, args):
+    account = _authenticate(bank, args)
+    for t in account.get_history():
+        print(f"{t['date']} - {t['type']}: {format_money(t['amount'])} (Balance: {format_money(t['balance_after'])})")
+    return False
+
+
+def cmd_import(bank, args):
+    from bulk_import import import_accounts
+    result = import_accounts(bank, args.source, fmt=args.format, reject_filename=args.rejects,
+                             workers=args.workers)
+    print(f"Imported {result.imported} accounts, rejected {result.rejected}")
+    return True
+
+
+def cmd_export(bank, args):
+    if args.format == "npz":
+        from columnar import export_columns
+        count = export_columns(bank, args.output)
+        print(f"Exported {count} ledger entries to {args.output}")
+        return False
+    from export import export_ledgers
+    count = export_ledgers(bank, args.output, fmt=args.format, workers=args.workers, merge=not args.split)
+    print(f"Exported {count} ledger entries to {args.output}")
+    return False
+
+
+def cmd_audit(bank, args):
+    from audit import Auditor
+    discrepancies = Auditor(bank).audit()
+    for d in discrepancies:
+        print(f"Account {d.account_id}, entry {d.position}: {d.kind}: {d.detail}")
+    print(f"{len(discrepancies)} discrepancies found")
+    if discrepancies:
+        args.exit_code = 1
+    return False
+
+
+def cmd_bench(bank, args):
+    # Runs against a fresh in-memory bank so the real data is never touched
+    bench_bank = Bank()
+    start = time.perf_counter()
+    for i in range(1, args.accounts + 1):
+        bench_bank.create_account(f"bench{i}", 100000, "1234", f"bench{i}")
+    _report("create", args.accounts, start)
+
+    start = time.perf_counter()
+    for i in range(args.ops):
+        bench_bank.deposit_to_account(i % args.accounts + 1, 100)
+    _report("deposit", args.ops, start)
+
+    start = time.perf_counter()
+    for i in range(args.ops):
+        sender = i % args.accounts + 1
+        bench_bank.transfer_money(sender, sender % args.accounts + 1, 100, "1234")
+    _report("transfer", args.ops, start)
+
+    # Same write path again with the balance index maintained, to show its overhead
+    bench_bank.balance_index
+    start = time.perf_counter()
+    for i in range(args.ops):
+        bench_bank.deposit_to_account(i % args.accounts + 1, 100)
+    _report("deposit+ix", args.ops, start)
+
+    start = time.perf_counter()
+    for i in range(args.ops):
+        sender = i % args.accounts + 1
+        bench_bank.transfer_money(sender, sender % args.accounts + 1, 100, "1234")
+    _report("transfer+ix", args.ops, start)
+
+    start = time.perf_counter()
+    for i in range(args.ops):
+        bench_bank.balance_index.top(10)
+    _report("top10", args.ops, start)
+
+    for i in range(args.ops):
+        sender = i % args.accounts + 1
+        bench_bank.standing_orders.add(sender, sender % args.accounts + 1, 100, DAY, first_due=0)
+    start = time.perf_counter()
+    bench_bank.standing_orders.tick(now=0)
+    _report("tick", args.ops, start)
+
+    # Transfers again with a velocity rule that every payment is checked against
+    from velocity import VelocityRule
+    bench_bank.velocity.set_rule(VelocityRule("bench", DAY, max_count=10 ** 9))
+    start = time.perf_counter()
+    for account in bench_bank.accounts.values():
+        bench_bank.velocity.check(account, "TRANSFER_OUT", 0)
+    _report("vel-rebuild", args.accounts, start)
+    start = time.perf_counter()
+    for i in range(args.ops):
+        sender = i % args.accounts + 1
+        bench_bank.transfer_money(sender, sender % args.accounts + 1, 100, "1234")
+    _report("transfer+vel", args.ops, start)
+
+    # Durable deposits from concurrent clients, each waiting for its commit,
+    # at a range of group-commit latency/batch bounds
+    import tempfile
+    import threading
+    from writer import GroupCommitWriter
+    per_thread = max(args.ops // args.threads, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        for max_latency, max_batch in WRITER_SETTINGS:
+            bench_bank = Bank()
+            for i in range(1, args.accounts + 1):
+                bench_bank.create_account(f"bench{i}", 100000, "1234", f"bench{i}")
+            filename = f"{directory}/gc-{max_batch}.json"
+            bench_bank.save_to_file(filename)
+            writer = GroupCommitWriter(bench_bank, filename, max_latency, max_batch)
+            writer.start()
+
+            def client(offset):
+                for i in range(per_thread):
+                    bench_bank.deposit_to_account((offset + i * args.threads) % args.accounts + 1, 100)
+                    writer.wait()
+
+            clients = [threading.Thread(target=client, args=(n,)) for n in range(args.threads)]
+            start = time.perf_counter()
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+            _report(f"gc {max_latency * 1000:g}ms/{max_batch}", per_thread * args.threads, start)
+            writer.stop()
+    return False
+
+
+def _report(name, count, start):
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{name:>12}: {count} ops in {elapsed:.3f}s ({rate:,.0f} ops/s)")
+
+
+def cmd_batch(bank, args):
+    """Run one command per line from stdin, saving once at the end"""
+    parser = build_parser(batch=True)
+    changed = False
+    failures = 0
+    for line_number, line in enumerate(sys.stdin, 1):
+        try:
+            words = shlex.split(line, comments=True)
+            if not words:
+                continue
+            command = parser.parse_args(words)
+            command.exit_code = 0
+            changed = command.func(bank, command) or changed
+            if command.exit_code:
+                failures += 1
+        except SystemExit:
+            failures += 1
+            print(f"Line {line_number}: invalid command", file=sys.stderr)
+        except (ValueError, OSError) as e:
+            # A failing line never discards the work of the lines before it
+            failures += 1
+            print(f"Line {line_number}: Error: {e}", file=sys.stderr)
+    if failures:
+        args.exit_code = 1
+    return changed
+
+
+def build_parser(batch=False):
+    parser = argparse.ArgumentParser(prog="banklite", description="BankLite command-line interface")
+    if not batch:
+        parser.add_argument("--file", default="bank.json", help="bank file (.json or .bkl)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("create", help="create an account")
+    command.add_argument("name")
+    command.add_argument("--balance", type=to_cents, default=0, help="initial balance in dollars")
+    command.add_argument("--pin", required=True)
+    command.add_argument("--mobile", required=True)
+    command.set_defaults(func=cmd_create)
+
+    for name, func in (("deposit", cmd_deposit), ("withdraw", cmd_withdraw)):
+        command = commands.add_parser(name, help=f"{name} money")
+        command.add_argument("account_id", type=int)
+        command.add_argument("amount", type=to_cents, help="amount in dollars")
+        command.add_argument("--pin", required=True)
+        command.add_argument("--key", help="idempotency key for safe retries")
+        command.set_defaults(func=func)
+
+    command = commands.add_parser("transfer", help="transfer money between accounts")
+    command.add_argument("sender_id", type=int)
+    command.add_argument("receiver_id", type=int)
+    command.add_argument("amount", type=to_cents, help="amount in dollars")
+    command.add_argument("--pin", required=True, help="sender PIN")
+    command.add_argument("--key", help="idempotency key for safe retries")
+    command.set_defaults(func=cmd_transfer)
+
+    command = commands.add_parser("order", help="create a standing order (recurring transfer)")
+    command.add_argument("sender_id", type=int)
+    command.add_argument("receiver_id", type=int)
+    command.add_argument("amount", type=to_cents, help="amount in dollars")
+    command.add_argument("--pin", required=True, help="sender PIN")
+    command.add_argument("--days", type=float, required=True, help="days between payments")
+    command.add_argument("--start", help="first payment date (YYYY-MM-DD), default now")
+    command.add_argument("--count", type=int, help="number of payments, default until cancelled")
+    command.set_defaults(func=cmd_order)
+
+    command = commands.add_parser("cancel-order", help="cancel a standing order")
+    command.add_argument("order_id", type=int)
+    command.add_argument("--pin", required=True, help="sender PIN")
+    command.set_defaults(func=cmd_cancel_order)
+
+    command = commands.add_parser("limit", help="set or remove a velocity limit on payments out")
+    command.add_argument("name")
+    command.add_argument("--hours", type=float, default=24, help="length of the sliding window")
+    command.add_argument("--count", type=int, help="maximum number of payments per window")
+    command.add_argument("--amount", type=to_cents, help="maximum total in dollars per window")
+    command.add_argument("--applies-to", choices=tuple(LIMIT_TYPES), default="all")
+    command.add_argument("--remove", action="store_true")
+    command.set_defaults(func=cmd_limit)
+
+    command = commands.add_parser("tick", help="execute due standing orders")
+    command.set_defaults(func=cmd_tick)
+
+    command = commands.add_parser("close", help="close an account with a zero balance")
+    command.add_argument("account_id", type=int)
+    command.add_argument("--pin", required=True)
+    command.set_defaults(func=cmd_close)
+
+    command = commands.add_parser("closed", help="show a closed account and its history")
+    command.add_argument("account_id", type=int)
+    command.add_argument("--pin", required=True)
+    command.set_defaults(func=cmd_closed)
+
+    for name, func in (("balance", cmd_balance), ("history", cmd_history), ("orders", cmd_orders)):
+        command = commands.add_parser(name, help=f"show account {name}")
+        command.add_argument("account_id", type=int)
+        command.add_argument("--pin", required=True)
+        command.set_defaults(func=func)
+
+    command = commands.add_parser("import", help="bulk import accounts from CSV or JSONL")
+    command.add_argument("source")
+    command.add_argument("--format", choices=("csv", "jsonl"))
+    command.add_argument("--rejects", help="file to write rejected rows to")
+    command.add_argument("--workers", type=int)
+    command.set_defaults(func=cmd_import)
+
+    command = commands.add_parser("export", help="export ledgers or statements")
+    command.add_argument("output")
+    command.add_argument("--format", choices=("csv", "jsonl", "statement", "npz"), default="csv",
+                         help="npz writes NumPy-loadable columns for analysis")
+    command.add_argument("--workers", type=int)
+    command.add_argument("--split", action="store_true", help="write one file per partition into OUTPUT")
+    command.set_defaults(func=cmd_export)
+
+    command = commands.add_parser("audit", help="check ledger invariants")
+    command.set_defaults(func=cmd_audit)
+
+    command = commands.add_parser("bench", help="measure operation throughput on a scratch bank")
+    command.add_argument("--accounts", type=int, default=1000)
+    command.add_argument("--ops", type=int, default=10000)
+    command.add_argument("--threads", type=int, default=32, help="clients for the durable (group commit) rows")
+    command.set_defaults(func=cmd_bench)
+
+    if not batch:
+        command = commands.add_parser("batch", help="run commands read from stdin, one per line")
+        command.set_defaults(func=cmd_batch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.exit_code = 0
+    bank = Bank()
+    bank.load_from_file(args.file)
+    try:
+        changed = args.func(bank, args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if changed:
+        # Import rewrites most of the bank; everything else only touches a few accounts
+        if args.command == "import":
+            bank.save_to_file(args.file)
+        else:
+            bank.save_changes(args.file)
+    return args.exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import functools
+import json
+import lzma
+import os
+import zlib
+from datetime import datetime, timedelta
+from money import CENTS_FORMAT, migrate_entry
+
+# codec name -> (file extension, compress, decompress)
+CODECS = {
+    "zlib": (".zz", zlib.compress, zlib.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress),
+}
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _codec_for(path):
+    for extension, compress, decompress in CODECS.values():
+        if path.endswith(extension):
+            return compress, decompress
+    raise ValueError(f"Unknown cold segment type: {path}")
+
+
+@functools.lru_cache(maxsize=32)
+def load_segment(path, fmt=CENTS_FORMAT):
+    """Decompress a cold ledger segment.
+
+    Segments are immutable once written, so decoded segments are kept in a
+    small LRU cache and shared between readers. Segments written before
+    amounts were stored in cents are converted as they are read.
+    """
+    _, decompress = _codec_for(path)
+    with open(path, "rb") as f:
+        entries = json.loads(decompress(f.read()))
+    if fmt < CENTS_FORMAT:
+        entries = [migrate_entry(entry) for entry in entries]
+    return tuple(entries)
+
+
+def read_segment(segment):
+    """Return the entries of the segment described by a cold segment descriptor"""
+    return load_segment(segment["path"], segment.get("format", 1))
+
+
+class ColdStorage:
+    """Moves old ledger entries out of memory into compressed segments.
+
+    Entries are archived once an account keeps more than ``max_hot`` of
+    them in memory, or once they are older than ``max_age_days``. Each
+    archive run writes one new immutable segment per account, and only
+    when at least ``min_segment`` entries qualify. Segments go to
+    ``directory``, which defaults to ``<bank file>.cold`` for the file the
+    bank is saved to, so banks sharing a working directory never collide.
+    """
+
+    def __init__(self, directory=None, codec="zlib", max_hot=1000, max_age_days=None, min_segment=100):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        self.directory = directory
+        self.codec = codec
+        self.max_hot = max_hot
+        self.max_age_days = max_age_days
+        self.min_segment = min_segment
+
+    def _split_point(self, transactions, now):
+        split = 0
+        if self.max_hot is not None and len(transactions) > self.max_hot:
+            split = len(transactions) - self.max_hot
+        if self.max_age_days is not None:
+            # Ledger dates are zero-padded, so they sort as strings
+            cutoff = (now - timedelta(days=self.max_age_days)).strftime(DATE_FORMAT)
+            while split < len(transactions) and transactions[split]["date"] < cutoff:
+                split += 1
+        return split
+
+    def archive(self, account, now=None):
+        """Archive the cold part of an account's ledger; return the number of entries moved"""
+        transactions = account.transactions
+        split = self._split_point(transactions, now or datetime.now())
+        if split == 0 or split < self.min_segment:
+            return 0
+        if self.directory is None:
+            raise ValueError("Cold storage has no directory; save the bank to a file first")
+
+        entries = transactions[:split]
+        extension, compress, _ = CODECS[self.codec]
+        os.makedirs(self.directory, exist_ok=True)
+        # Absolute, so the bank finds its segments whatever directory it is loaded from
+        path = os.path.abspath(os.path.join(self.directory, f"{account.id}-{len(account.cold_segments)}{extension}"))
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(compress(json.dumps(entries, separators=(",", ":")).encode("utf-8")))
+        os.replace(temp_path, path)
+
+        # Replace rather than mutate the lists, so readers holding the old ones are unaffected
+        account.cold_segments = account.cold_segments + [{
+            "path": path,
+            "count": len(entries),
+            "first_date": entries[0]["date"],
+            "last_date": entries[-1]["date"],
+            "format": CENTS_FORMAT,
+        }]
+        account.transactions = transactions[split:]
+        return len(entries)
@@ -0,0 +1,147 @@
+"""Columnar export of all ledgers for vectorized analysis.
+
+Every ledger entry becomes one row of six parallel columns, written as a
+NumPy ``.npz`` archive without needing NumPy to write it::
+
+    data = numpy.load("ledger.npz")
+    data["account_id"], data["timestamp"], data["type"], data["amount"],
+    data["balance_after"], data["counterparty"], data["types"]
+
+``type`` holds codes into the ``types`` name array, amounts and balances
+are integer cents, ``counterparty`` is -1 for entries without one, and
+``timestamp`` is datetime64[s] holding the ledger's wall-clock time.
+"""
+import ast
+import struct
+import sys
+import tempfile
+import zipfile
+from array import array
+from datetime import date
+
+# Known entry types get fixed codes; any others are numbered after them
+TYPES = ["DEPOSIT", "WITHDRAWAL", "TRANSFER_OUT", "TRANSFER_IN", "PIN_CHANGE"]
+
+# Column name -> (array typecode, .npy dtype descriptor)
+COLUMNS = {
+    "account_id": ("q", "<i8"),
+    "timestamp": ("q", "<M8[s]"),
+    "type": ("b", "|i1"),
+    "amount": ("q", "<i8"),
+    "balance_after": ("q", "<i8"),
+    "counterparty": ("q", "<i8"),
+}
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+EPOCH = date(1970, 1, 1).toordinal()
+
+
+def iter_chunks(bank, chunk_rows=1 << 16, types=None):
+    """Yield {column: array} chunks of about chunk_rows rows covering every ledger.
+
+    Reads a snapshot of the bank, so posting can continue meanwhile.
+    ``types`` is the list of type names that codes refer to; unknown
+    types are appended to it as they are met.
+    """
+    types = TYPES.copy() if types is None else types
+    codes = {name: code for code, name in enumerate(types)}
+    days = {}  # "YYYY-MM-DD" -> seconds since the epoch at midnight
+    chunk = _new_chunk()
+    account_ids, timestamps, type_codes, amounts, balances, counterparties = chunk.values()
+
+    snapshot = bank.snapshot()
+    for account_id in sorted(snapshot):
+        for entry in snapshot[account_id].get_history():
+            stamp = entry["date"]
+            day = days.get(stamp[:10])
+            if day is None:
+                day = days[stamp[:10]] = (date.fromisoformat(stamp[:10]).toordinal() - EPOCH) * 86400
+            code = codes.get(entry["type"])
+            if code is None:
+                code = codes[entry["type"]] = len(types)
+                types.append(entry["type"])
+            account_ids.append(account_id)
+            timestamps.append(day + int(stamp[11:13]) * 3600 + int(stamp[14:16]) * 60 + int(stamp[17:19]))
+            type_codes.append(code)
+            amounts.append(entry["amount"])
+            balances.append(entry["balance_after"])
+            counterparties.append(entry.get("receiver_id", entry.get("sender_id", -1)))
+        if len(account_ids) >= chunk_rows:
+            yield chunk
+            chunk = _new_chunk()
+            account_ids, timestamps, type_codes, amounts, balances, counterparties = chunk.values()
+    if account_ids:
+        yield chunk
+
+
+def _new_chunk():
+    return {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+
+
+def _npy_header(descr, length):
+    header = repr({"descr": descr, "fortran_order": False, "shape": (length,)})
+    # Pad so the data starts on a 64-byte boundary, as numpy.save does
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+def export_columns(bank, filename, chunk_rows=1 << 16):
+    """Write every ledger entry as columns to an .npz file; return the number of rows"""
+    types = TYPES.copy()
+    # Chunks are spooled to one temporary file per column, so memory use
+    # stays bounded however large the bank is
+    spools = {name: tempfile.TemporaryFile() for name in COLUMNS}
+    rows = 0
+    try:
+        for chunk in iter_chunks(bank, chunk_rows, types):
+            rows += len(chunk["account_id"])
+            for name, column in chunk.items():
+                if sys.byteorder == "big":
+                    column.byteswap()
+                column.tofile(spools[name])
+        with zipfile.ZipFile(filename, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name, (_, descr) in COLUMNS.items():
+                spool = spools[name]
+                spool.seek(0)
+                with archive.open(name + ".npy", "w", force_zip64=True) as f:
+                    f.write(_npy_header(descr, rows))
+                    while True:
+                        block = spool.read(1 << 20)
+                        if not block:
+                            break
+                        f.write(block)
+            width = max(len(name) for name in types)
+            with archive.open("types.npy", "w") as f:
+                f.write(_npy_header(f"<U{width}", len(types)))
+                f.write(b"".join(name.ljust(width, "\0").encode("utf-32-le") for name in types))
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return rows
+
+
+def read_columns(filename):
+    """Read an .npz written by export_columns into {column: array}, without NumPy.
+
+    The ``types`` entry is returned as a list of names.
+    """
+    columns = {}
+    with zipfile.ZipFile(filename) as archive:
+        for name, (typecode, _) in COLUMNS.items():
+            column = array(typecode)
+            column.frombytes(_npy_data(archive.read(name + ".npy"))[1])
+            if sys.byteorder == "big":
+                column.byteswap()
+            columns[name] = column
+        header, data = _npy_data(archive.read("types.npy"))
+        width = int(header["descr"][2:]) * 4
+        columns["types"] = [data[i:i + width].decode("utf-32-le").rstrip("\0")
+                            for i in range(0, len(data), width)]
+    return columns
+
+
+def _npy_data(raw):
+    length = struct.unpack("<H", raw[8:10])[0]
+    header = ast.literal_eval(raw[10:10 + length].decode("latin1"))
+    return header, raw[10 + length:]
@@ -0,0 +1,196 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+Event = namedtuple("Event", ["seq", "kind", "account_id", "timestamp", "data"])
+
+ACCOUNT_CREATED = "ACCOUNT_CREATED"
+DEPOSIT = "DEPOSIT"
+WITHDRAWAL = "WITHDRAWAL"
+TRANSFER = "TRANSFER"
+PIN_CHANGED = "PIN_CHANGED"
+ACCOUNT_CLOSED = "ACCOUNT_CLOSED"
+
+
+class EventStream:
+    """Bounded in-process ring buffer of bank mutation events.
+
+    Every event gets the next sequence number. Publishing only appends to
+    the ring and wakes waiting readers; it never waits for them. A reader
+    that falls more than ``capacity`` events behind loses the oldest ones
+    and is told how many it missed.
+    """
+
+    def __init__(self, capacity=10000, next_seq=1):
+        self.capacity = capacity
+        self._buffer = deque(maxlen=capacity)
+        self._next_seq = next_seq
+        self._condition = threading.Condition()
+        self._blocked = 0  # Threads waiting in Subscription.wait
+        self._async_waiters = set()  # (event loop, asyncio.Event) pairs
+
+    @property
+    def last_seq(self):
+        """Sequence number of the latest event, or 0 if none was ever published"""
+        return self._next_seq - 1
+
+    def resume(self, last_seq):
+        """Continue numbering after last_seq, e.g. the last sequence number saved with the bank"""
+        with self._condition:
+            self._next_seq = max(self._next_seq, last_seq + 1)
+
+    def publish(self, kind, account_id, **data):
+        """Append an event and wake readers; called on the posting path"""
+        with self._condition:
+            event = Event(self._next_seq, kind, account_id, time.time(), data)
+            self._next_seq += 1
+            self._buffer.append(event)
+            if self._blocked:
+                self._condition.notify_all()
+            waiters = list(self._async_waiters) if self._async_waiters else ()
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                pass  # The reader's event loop has closed
+        return event
+
+    def read(self, after_seq, limit=None):
+        """Return (events after after_seq, number of events already overwritten)"""
+        with self._condition:
+            if not self._buffer:
+                return [], 0
+            first_seq = self._buffer[0].seq
+            missed = max(0, first_seq - after_seq - 1)
+            start = max(0, after_seq + 1 - first_seq)
+            stop = None if limit is None else start + limit
+            return list(itertools.islice(self._buffer, start, stop)), missed
+
+    def subscribe(self, after_seq=None):
+        """Return a Subscription reading events after after_seq (default: only new ones)"""
+        return Subscription(self, self.last_seq if after_seq is None else after_seq)
+
+    def _wait(self, after_seq, timeout):
+        with self._condition:
+            self._blocked += 1
+            try:
+                return self._condition.wait_for(lambda: self.last_seq > after_seq, timeout)
+            finally:
+                self._blocked -= 1
+
+    async def _wait_async(self, after_seq):
+        # Imported here since asyncio is slow to import and only async subscribers need it
+        import asyncio
+        waiter = asyncio.Event()
+        entry = (asyncio.get_running_loop(), waiter)
+        with self._condition:
+            if self.last_seq > after_seq:
+                return
+            self._async_waiters.add(entry)
+        try:
+            await waiter.wait()
+        finally:
+            with self._condition:
+                self._async_waiters.discard(entry)
+
+
+class Subscription:
+    """A reader's position in an EventStream.
+
+    ``position`` is the sequence number of the last event consumed, which
+    can be stored and passed to EventStream.subscribe to resume later.
+    """
+
+    def __init__(self, stream, after_seq):
+        self.stream = stream
+        self.position = after_seq
+        self.missed = 0  # Events overwritten before this reader got to them
+
+    def poll(self, limit=None):
+        """Return the events published since the last call, without blocking"""
+        events, missed = self.stream.read(self.position, limit)
+        self.missed += missed
+        if events:
+            self.position = events[-1].seq
+        elif missed:
+            self.position = self.stream.last_seq
+        return events
+
+    def wait(self, timeout=None, limit=None):
+        """Block until events are available (or the timeout passes) and return them"""
+        self.stream._wait(self.position, timeout)
+        return self.poll(limit)
+
+    async def next_events(self, limit=None):
+        """Wait for events from asyncio code and return them"""
+        while True:
+            events = self.poll(limit)
+            if events:
+                return events
+            await self.stream._wait_async(self.position)
+
+    async def __aiter__(self):
+        while True:
+            for event in await self.next_events():
+                yield event
+
+
+class FileSink:
+    """Appends the events of a stream to a JSONL file from a background thread.
+
+    On start the sink resumes after the last sequence number already in the
+    file, so restarting it neither repeats nor skips events that are still
+    in the ring buffer. External tools can tail the file.
+    """
+
+    def __init__(self, stream, filename, poll_interval=0.5):
+        self.stream = stream
+        self.filename = filename
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._thread = None
+        self.subscription = None
+
+    def _last_written_seq(self):
+        try:
+            with open(self.filename, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 4096))
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        for line in reversed(lines):
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError):
+                continue
+        return None
+
+    def start(self):
+        """Start writing events in the background"""
+        self.subscription = self.stream.subscribe(self._last_written_seq())
+        self._thread = threading.Thread(target=self._run, name="BankLite event sink", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write any remaining events and stop the background thread"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _write(self, events):
+        with open(self.filename, "a") as f:
+            f.writelines(json.dumps(event._asdict()) + "\n" for event in events)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            events = self.subscription.wait(self.poll_interval)
+            if events:
+                self._write(events)
+        events = self.subscription.poll()
+        if events:
+            self._write(events)
@@ -0,0 +1,96 @@
+import csv
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from coldstore import read_segment
+from money import format_cents, format_money
+
+FORMATS = ("csv", "jsonl", "statement")
+CSV_COLUMNS = ["account_id", "name", "date", "type", "amount", "balance_after", "counterparty"]
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "statement": ".txt"}
+
+
+def _snapshot(bank):
+    """Capture a consistent copy of every account's ledger.
+
+    The copy is taken from a bank snapshot, so posting continues while it
+    is made. Only the hot tail is copied; cold segments are immutable, so
+    workers read them straight from disk.
+    """
+    snapshot = bank.snapshot()
+    return [
+        (account.id, account.name, account.balance,
+         tuple(account.cold_segments), account.transactions)
+        for account in sorted(snapshot.values(), key=lambda account: account.id)
+    ]
+
+
+def _counterparty(entry):
+    return entry.get("receiver_id", entry.get("sender_id", ""))
+
+
+def _write_partition(path, fmt, accounts, header):
+    """Write one partition of the export; runs in a worker process"""
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer and header:
+            writer.writerow(CSV_COLUMNS)
+        for account_id, name, balance, cold_segments, hot in accounts:
+            entries = [entry for segment in cold_segments for entry in read_segment(segment)] + hot
+            if fmt == "csv":
+                writer.writerows([account_id, name, entry["date"], entry["type"], format_cents(entry["amount"]),
+                                  format_cents(entry["balance_after"]), _counterparty(entry)] for entry in entries)
+            elif fmt == "jsonl":
+                f.writelines(json.dumps({"account_id": account_id, **entry}) + "\n" for entry in entries)
+            else:
+                f.write(f"Statement for account {account_id}: {name}\n")
+                f.writelines(f"  {t['date']} - {t['type']}: {format_money(t['amount'])} "
+                             f"(Balance: {format_money(t['balance_after'])})\n" for t in entries)
+                f.write(f"  Closing balance: {format_money(balance)}\n\n")
+            count += len(entries)
+    return count
+
+
+def export_ledgers(bank, output, fmt="csv", workers=None, merge=True):
+    """Export every ledger as CSV rows, JSONL records or text statements.
+
+    The export runs against a snapshot taken up front, so the bank stays
+    available for new operations while it is written. Accounts are split
+    into contiguous partitions, one per worker process. With ``merge`` the
+    partitions are concatenated into the single file ``output``; otherwise
+    ``output`` is a directory that receives one file per partition.
+    CSV and statements show amounts in dollars; JSONL records keep integer
+    cents, like the bank file itself. Returns the number of ledger entries
+    written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    accounts = _snapshot(bank)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(accounts)))
+
+    if merge:
+        paths = [f"{output}.part{index}" for index in range(workers)]
+    else:
+        os.makedirs(output, exist_ok=True)
+        paths = [os.path.join(output, f"part-{index:05d}{EXTENSIONS[fmt]}") for index in range(workers)]
+
+    size = -(-len(accounts) // workers)
+    partitions = [accounts[index * size:(index + 1) * size] for index in range(workers)]
+    # Merged CSV output gets a single header, written before the partitions
+    header = not merge
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_write_partition, path, fmt, partition, header)
+                   for path, partition in zip(paths, partitions)]
+        count = sum(future.result() for future in futures)
+
+    if merge:
+        with open(output, "w", newline="") as out:
+            if fmt == "csv":
+                csv.writer(out).writerow(CSV_COLUMNS)
+            for path in paths:
+                with open(path, "r", newline="") as part:
+                    shutil.copyfileobj(part, out)
+                os.remove(path)
+    return count
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from bank import Bank
+from autosave import Autosaver
+from money import format_money, to_cents
 
 class BankLiteGUI:
     def __init__(self, root):
@@ -13,6 +15,11 @@ class BankLiteGUI:
         self.bank = Bank()
         self.bank.load_from_file()
 
+        # Persist changed accounts in the background so a crash loses seconds, not the session
+        self.autosaver = Autosaver(self.bank)
+        self.autosaver.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Style configuration
         self.style = ttk.Style()
         self.style.theme_use("clam")
@@ -58,6 +65,7 @@ class BankLiteGUI:
         self.create_button(buttons_frame, "Withdraw Money", self.withdraw_money)
         self.create_button(buttons_frame, "Transfer Money", self.transfer_money)
         self.create_button(buttons_frame, "Change PIN", self.change_pin)
+        self.create_button(buttons_frame, "Close Account", self.close_account)
         self.create_button(buttons_frame, "View Balance", self.view_balance)
         self.create_button(buttons_frame, "View Transaction History", self.view_history)
         self.create_button(buttons_frame, "Save & Exit", self.save_and_exit)
@@ -90,7 +98,7 @@ class BankLiteGUI:
             return
 
         try:
-            account = self.bank.create_account(name, initial_balance, pin, mobile)
+            account = self.bank.create_account(name, to_cents(initial_balance), pin, mobile)
             messagebox.showinfo("Success", f"Account created successfully!\n\nAccount ID: {account.id}\nMobile: {account.mobile}\nPIN: {account.pin}\n\nPlease save this information securely.")
             self.status_label.config(text=f"Account {account.id} created successfully")
         except ValueError as e:
@@ -121,8 +129,8 @@ class BankLiteGUI:
             return
 
         try:
-            new_balance = self.bank.deposit_to_account(account.id, amount)
-            messagebox.showinfo("Success", f"Deposit successful. New balance: ${new_balance:.2f}")
+            new_balance = self.bank.deposit_to_account(account.id, to_cents(amount))
+            messagebox.showinfo("Success", f"Deposit successful. New balance: {format_money(new_balance)}")
             self.status_label.config(text=f"Deposited ${amount:.2f} to account {account.id}")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
@@ -138,8 +146,8 @@ class BankLiteGUI:
             return
 
         try:
-            new_balance = self.bank.withdraw_from_account(account.id, amount)
-            messagebox.showinfo("Success", f"Withdrawal successful. New balance: ${new_balance:.2f}")
+            new_balance = self.bank.withdraw_from_account(account.id, to_cents(amount))
+            messagebox.showinfo("Success", f"Withdrawal successful. New balance: {format_money(new_balance)}")
             self.status_label.config(text=f"Withdrew ${amount:.2f} from account {account.id}")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
@@ -165,8 +173,8 @@ class BankLiteGUI:
             return
 
         try:
-            sender_balance, receiver_balance = self.bank.transfer_money(sender_id, receiver_id, amount, sender_pin)
-            messagebox.showinfo("Success", f"Transfer successful!\nYour new balance: ${sender_balance:.2f}\nReceiver's new balance: ${receiver_balance:.2f}")
+            sender_balance, receiver_balance = self.bank.transfer_money(sender_id, receiver_id, to_cents(amount), sender_pin)
+            messagebox.showinfo("Success", f"Transfer successful!\nYour new balance: {format_money(sender_balance)}\nReceiver's new balance: {format_money(receiver_balance)}")
             self.status_label.config(text=f"Transferred ${amount:.2f} from account {sender_id} to {receiver_id}")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
@@ -190,6 +198,20 @@ class BankLiteGUI:
         except ValueError as e:
             messagebox.showerror("Error", str(e))
 
+    def close_account(self):
+        account = self.authenticate_and_get_account()
+        if not account:
+            return
+        if not messagebox.askyesno("Close Account", f"Close account {account.id}? This cannot be undone."):
+            return
+
+        try:
+            self.bank.close_account(account.id, account.pin)
+            messagebox.showinfo("Success", f"Account {account.id} closed.")
+            self.status_label.config(text=f"Account {account.id} closed")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+
     def select_account(self, title):
         """Create a dialog to select an account from the list"""
         if not self.bank.accounts:
@@ -248,11 +270,17 @@ class BankLiteGUI:
             messagebox.showinfo("Transaction History", "No transactions found.")
             return
 
-        history_text = "\n".join([f"{t['date']} - {t['type']}: ${t['amount']:.2f} (Balance: ${t['balance_after']:.2f})" for t in history])
+        history_text = "\n".join([f"{t['date']} - {t['type']}: {format_money(t['amount'])} (Balance: {format_money(t['balance_after'])})" for t in history])
         messagebox.showinfo("Transaction History", history_text)
         self.status_label.config(text=f"Viewed history for account {account.id}")
 
+    def on_close(self):
+        """Flush pending changes when the window is closed"""
+        self.autosaver.stop()
+        self.root.destroy()
+
     def save_and_exit(self):
+        self.autosaver.stop(flush=False)
         self.bank.save_to_file()
         messagebox.showinfo("Saved", "Data saved successfully. Exiting...")
         self.root.quit()
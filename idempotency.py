@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+
+class IdempotencyCache:
+    """Bounded, time-windowed record of completed requests.
+
+    Keys are kept in insertion order, so expiring old keys and evicting the
+    oldest key when the cache is full are both O(1), as are lookups.
+    """
+
+    def __init__(self, max_entries=10000, window_seconds=24 * 60 * 60):
+        self.max_entries = max_entries
+        self.window_seconds = window_seconds
+        self._entries = OrderedDict()  # key -> (timestamp, fingerprint, result)
+        self.pending = []  # Keys stored since the last save, for incremental saves
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expire(self, now):
+        cutoff = now - self.window_seconds
+        while self._entries:
+            key, (timestamp, _, _) = next(iter(self._entries.items()))
+            if timestamp >= cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def lookup(self, key, fingerprint, now=None):
+        """Return (True, result) if the key was already used, else (False, None)"""
+        self._expire(now or time.time())
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[1] != fingerprint:
+            raise ValueError("Idempotency key was already used for a different request")
+        return True, entry[2]
+
+    def store(self, key, fingerprint, result, now=None):
+        """Remember the result of a completed request"""
+        self._entries[key] = (now or time.time(), fingerprint, result)
+        self.pending.append(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record(self, key):
+        """Return the serializable record for a key, or None if it has been evicted"""
+        entry = self._entries.get(key)
+        return [key, *entry] if entry is not None else None
+
+    def to_list(self):
+        """Convert the cache to a list for JSON storage"""
+        return [[key, *entry] for key, entry in self._entries.items()]
+
+    def load(self, records):
+        """Add records produced by to_list or record, oldest first"""
+        for key, timestamp, fingerprint, result in records:
+            # JSON turns result tuples into lists
+            if isinstance(result, list):
+                result = tuple(result)
+            self._entries[key] = (timestamp, fingerprint, result)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._expire(time.time())
@@ -1,8 +1,14 @@
-import tkinter as tk
-from gui import BankLiteGUI
+import sys
 
 def main():
     """Main entry point for BankLite"""
+    # Any arguments select the headless CLI; Tkinter is only imported for the GUI
+    if len(sys.argv) > 1:
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    import tkinter as tk
+    from gui import BankLiteGUI
     root = tk.Tk()
     app = BankLiteGUI(root)
     root.mainloop()
@@ -0,0 +1,78 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Storage format version from which all amounts are saved as integer cents.
+# Files without a version (or with an older one) hold float dollar amounts.
+CENTS_FORMAT = 2
+
+# Amounts and balances are stored as signed 64-bit integers (.bkl slots, columnar export)
+MIN_CENTS = -2 ** 63
+MAX_CENTS = 2 ** 63 - 1
+
+# Ledger entry fields that hold money
+MONEY_FIELDS = ("amount", "balance_after")
+
+
+def to_cents(value):
+    """Convert a dollar amount (string, int, float or Decimal) to integer cents"""
+    try:
+        dollars = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}")
+    if not dollars.is_finite():
+        raise ValueError(f"Invalid amount: {value}")
+    return int((dollars * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def format_cents(cents):
+    """Format integer cents as a plain dollar string, e.g. -1234.50"""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def format_money(cents):
+    """Format integer cents for display, e.g. $1234.50"""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}${format_cents(abs(cents))}"
+
+
+def check_cents(amount):
+    """Reject amounts that are not integer cents or do not fit in 64 bits"""
+    if not isinstance(amount, int) or isinstance(amount, bool):
+        raise ValueError("Amounts must be given in integer cents")
+    if not MIN_CENTS <= amount <= MAX_CENTS:
+        raise ValueError("Amount is too large")
+
+
+def check_credit(balance, amount):
+    """Reject a credit that would take a balance beyond what can be stored"""
+    if balance + amount > MAX_CENTS:
+        raise ValueError("Balance would exceed the maximum supported amount")
+
+
+def migrate_entry(entry):
+    """Convert a ledger entry saved with dollar amounts to cents"""
+    entry = dict(entry)
+    for field in MONEY_FIELDS:
+        if field in entry:
+            entry[field] = to_cents(entry[field])
+    return entry
+
+
+def migrate_account_dict(data):
+    """Convert an account dictionary saved with dollar amounts to cents.
+
+    Cold segments are immutable, so they are left as they are; their
+    descriptors have no format version, which tells readers to migrate
+    their entries on load.
+    """
+    data = dict(data)
+    data["balance"] = to_cents(data["balance"])
+    data["transactions"] = [migrate_entry(entry) for entry in data.get("transactions", [])]
+    return data
+
+
+def migrate_result(result):
+    """Convert a stored operation result (a balance or a tuple of balances) to cents"""
+    if isinstance(result, (list, tuple)):
+        return type(result)(to_cents(value) for value in result)
+    return to_cents(result)
@@ -0,0 +1,232 @@
+import heapq
+import time
+from collections import namedtuple
+from datetime import datetime
+from money import check_cents
+
+DAY = 24 * 60 * 60
+
+TickResult = namedtuple("TickResult", ["executed", "retried", "skipped"])
+
+
+class StandingOrder:
+    """A recurring transfer; times are Unix timestamps and amounts integer cents"""
+
+    __slots__ = ("id", "sender_id", "receiver_id", "amount", "interval", "next_due",
+                 "remaining", "max_retries", "retry_delay", "failures")
+
+    def __init__(self, order_id, sender_id, receiver_id, amount, interval, next_due,
+                 remaining=None, max_retries=3, retry_delay=60 * 60, failures=0):
+        self.id = order_id
+        self.sender_id = sender_id
+        self.receiver_id = receiver_id
+        self.amount = amount
+        self.interval = interval
+        self.next_due = next_due
+        self.remaining = remaining  # Payments left, or None to repeat until cancelled
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.failures = failures  # Failed attempts at the current payment
+
+    def to_dict(self):
+        """Convert the order to a dictionary for JSON storage"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create an order from a dictionary produced by to_dict"""
+        return cls(data["id"], data["sender_id"], data["receiver_id"], data["amount"], data["interval"],
+                   data["next_due"], data.get("remaining"), data.get("max_retries", 3),
+                   data.get("retry_delay", 60 * 60), data.get("failures", 0))
+
+
+class StandingOrders:
+    """Persistent standing orders, executed in batches by tick().
+
+    Orders wait in a min-heap of (next_due, order_id), so finding the due
+    ones costs O(log n) each however many orders exist. Cancelled or
+    rescheduled orders leave stale heap entries behind, which are skipped
+    when popped.
+
+    A payment that fails (usually for insufficient funds) is retried after
+    ``retry_delay`` up to ``max_retries`` times; after that the payment is
+    skipped and the order waits for its next regular due time.
+    """
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.orders = {}
+        self.next_id = 1
+        self.dirty = set()  # IDs of orders added, changed or removed since the last save
+        self._heap = []
+        self._by_account = {}  # account_id -> IDs of orders paying from or to it
+
+    def __len__(self):
+        return len(self.orders)
+
+    def add(self, sender_id, receiver_id, amount, interval, first_due=None, count=None,
+            max_retries=3, retry_delay=60 * 60):
+        """Create a standing order paying ``amount`` every ``interval`` seconds, from first_due on"""
+        check_cents(amount)
+        if amount <= 0:
+            raise ValueError("Transfer amount must be positive")
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        if count is not None and count <= 0:
+            raise ValueError("Payment count must be positive")
+        if sender_id == receiver_id:
+            raise ValueError("Cannot transfer to the same account")
+        with self.bank.lock:
+            if sender_id not in self.bank.accounts or receiver_id not in self.bank.accounts:
+                raise ValueError("Account not found")
+            order = StandingOrder(self.next_id, sender_id, receiver_id, amount, interval,
+                                  time.time() if first_due is None else first_due,
+                                  count, max_retries, retry_delay)
+            self._put(order)
+            self._journal(order.id)
+        return order
+
+    def cancel(self, order_id):
+        """Remove a standing order"""
+        with self.bank.lock:
+            if order_id not in self.orders:
+                raise ValueError("Standing order not found")
+            self._drop(order_id)
+            self._journal(order_id)
+            if len(self._heap) > 2 * len(self.orders) + 64:
+                self._rebuild_heap()
+
+    def cancel_for_account(self, account_id):
+        """Remove every order paying from or to an account; return how many there were"""
+        with self.bank.lock:
+            order_ids = list(self._by_account.get(account_id, ()))
+            for order_id in order_ids:
+                self._drop(order_id)
+                self._journal(order_id)
+        return len(order_ids)
+
+    def for_account(self, account_id):
+        """Return the orders paying from or to an account"""
+        return [self.orders[order_id] for order_id in sorted(self._by_account.get(account_id, ()))]
+
+    def _put(self, order):
+        self.orders[order.id] = order
+        self.next_id = max(self.next_id, order.id + 1)
+        self.dirty.add(order.id)
+        heapq.heappush(self._heap, (order.next_due, order.id))
+        for account_id in (order.sender_id, order.receiver_id):
+            self._by_account.setdefault(account_id, set()).add(order.id)
+
+    def _drop(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            for account_id in (order.sender_id, order.receiver_id):
+                order_ids = self._by_account.get(account_id)
+                order_ids.discard(order_id)
+                if not order_ids:
+                    del self._by_account[account_id]
+        self.dirty.add(order_id)
+
+    def tick(self, now=None, save_filename=None):
+        """Execute every order due by ``now`` as one batch and return a TickResult.
+
+        The batch holds the bank lock once and posts transfers directly,
+        with one timestamp and without per-payment authentication or saving. If ``save_filename``
+        is given the bank is saved once after the batch.
+        """
+        now = time.time() if now is None else now
+        bank = self.bank
+        # Every payment in the batch is dated with the time the tick ran
+        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with bank.lock:
+            # A journal writer commits the batch at once, so no payment is kept without its new due time
+            executed, retried, skipped = bank._atomic(lambda: self._run_due(now, date))
+        if save_filename and (executed or retried or skipped):
+            bank.save_changes(save_filename)
+        return TickResult(executed, retried, skipped)
+
+    def _run_due(self, now, date):
+        # Called under the bank lock, since cancel() may replace the heap
+        bank = self.bank
+        executed = retried = skipped = 0
+        requeue = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, order_id = heapq.heappop(heap)
+            order = self.orders.get(order_id)
+            if order is None or order.next_due != due:
+                continue  # Cancelled or rescheduled since this entry was queued
+            sender = bank.accounts.get(order.sender_id)
+            receiver = bank.accounts.get(order.receiver_id)
+            try:
+                if sender is None or receiver is None:
+                    raise ValueError("Account not found")
+                bank._post_transfer(sender, receiver, order.amount, date)
+            except ValueError:
+                if order.failures < order.max_retries:
+                    order.failures += 1
+                    order.next_due = due + order.retry_delay
+                    retried += 1
+                    self.dirty.add(order_id)
+                    self._journal(order_id)
+                    requeue.append((order.next_due, order_id))
+                    continue
+                skipped += 1
+            else:
+                executed += 1
+            # This payment is settled; retries do not shift the regular schedule
+            order.next_due = due - order.failures * order.retry_delay + order.interval
+            order.failures = 0
+            self.dirty.add(order_id)
+            if order.remaining is not None:
+                order.remaining -= 1
+                if order.remaining == 0:
+                    self._drop(order_id)
+                    self._journal(order_id)
+                    continue
+            self._journal(order_id)
+            # Requeued after the loop, so an overdue order pays at most once per tick
+            requeue.append((order.next_due, order_id))
+        if len(requeue) > len(heap):
+            heap.extend(requeue)
+            heapq.heapify(heap)
+        else:
+            for item in requeue:
+                heapq.heappush(heap, item)
+        return executed, retried, skipped
+
+    def _journal(self, order_id):
+        # Hands the order's current state to the bank's journal writer, if one is attached
+        if self.bank.writer is not None:
+            self.bank._journal(self.record(order_id))
+
+    def record(self, order_id):
+        """Journal record for one changed order; ``order`` is None once it is removed"""
+        order = self.orders.get(order_id)
+        return {"standing_order": order_id, "order": order.to_dict() if order else None}
+
+    def apply(self, record):
+        """Apply a journal record produced by record()"""
+        self._drop(record["standing_order"])
+        self.next_id = max(self.next_id, record["standing_order"] + 1)
+        if record["order"] is not None:
+            self._put(StandingOrder.from_dict(record["order"]))
+
+    def to_dict(self):
+        """Convert all orders to a dictionary for JSON storage"""
+        return {"next_id": self.next_id, "orders": [order.to_dict() for order in self.orders.values()]}
+
+    def load(self, data):
+        """Replace all orders with those in a dictionary produced by to_dict"""
+        self.orders = {}
+        self._by_account = {}
+        self._heap = []
+        self.next_id = data.get("next_id", 1)
+        for order_data in data.get("orders", []):
+            self._put(StandingOrder.from_dict(order_data))
+        self.dirty.clear()
+
+    def _rebuild_heap(self):
+        # Drops the stale entries left behind by cancelled orders
+        self._heap = [(order.next_due, order.id) for order in self.orders.values()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,129 @@
+import json
+import time
+from coldstore import read_segment
+from binfile import is_binary_filename, write_bank_file
+from money import CENTS_FORMAT
+
+
+class AccountSnapshot:
+    """Read-only view of an account as it was when its snapshot was taken.
+
+    Ledgers are only ever appended to, and ColdStorage replaces lists
+    instead of changing them, so the view shares the live ledger list and
+    only remembers how many entries it had.
+    """
+
+    __slots__ = ("id", "name", "pin", "mobile", "balance", "cold_segments", "_ledger", "_length")
+
+    def __init__(self, account):
+        self.id = account.id
+        self.name = account.name
+        self.pin = account.pin
+        self.mobile = account.mobile
+        self.balance = account.balance
+        self.cold_segments = account.cold_segments
+        self._ledger = account.transactions
+        self._length = len(account.transactions)
+
+    @property
+    def transactions(self):
+        """Hot ledger entries at snapshot time"""
+        return self._ledger[:self._length]
+
+    def get_history(self):
+        """Full history at snapshot time, including cold segments"""
+        history = []
+        for segment in self.cold_segments:
+            history.extend(read_segment(segment))
+        history.extend(self.transactions)
+        return history
+
+    def history_length(self):
+        return sum(segment["count"] for segment in self.cold_segments) + self._length
+
+    def to_dict(self):
+        """Same dictionary as Account.to_dict, as of snapshot time"""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "pin": self.pin,
+            "mobile": self.mobile,
+            "balance": self.balance,
+            "transactions": self.transactions
+        }
+        if self.cold_segments:
+            data["cold_segments"] = self.cold_segments
+        return data
+
+
+class BankSnapshot:
+    """Immutable point-in-time view of a bank, returned by Bank.snapshot.
+
+    Taking a snapshot copies only the account dictionary. Before the bank
+    changes an account, it saves the account's current state into every
+    live snapshot that has not done so yet (copy-on-write), so reading a
+    snapshot from another thread never sees later or half-applied writes
+    and never blocks them.
+    """
+
+    def __init__(self, accounts, state, event_seq, lock):
+        self.taken_at = time.time()
+        self.state = state  # Bank-level state as written by Bank._state_to_dict
+        self.event_seq = event_seq  # Sequence number of the last event included
+        self._source = accounts
+        self._lock = lock
+        if isinstance(accounts, dict):
+            self._accounts = accounts.copy()
+        else:
+            # Lazily decoded accounts stay undecoded until the snapshot reads them
+            self._accounts = dict.fromkeys(accounts)
+        self._frozen = {}  # account_id -> AccountSnapshot saved before a write
+
+    def _preserve(self, account):
+        """Keep an account's current state; called by the bank before changing it"""
+        if account.id in self._accounts and account.id not in self._frozen:
+            self._frozen[account.id] = AccountSnapshot(account)
+
+    def __getitem__(self, account_id):
+        view = self._frozen.get(account_id)
+        if view is not None:
+            return view
+        account = self._accounts[account_id]
+        if account is None:
+            with self._lock:
+                view = self._frozen.get(account_id) or AccountSnapshot(self._source[account_id])
+        else:
+            view = AccountSnapshot(account)
+        # Writers preserve an account before changing it, so if nothing was
+        # preserved by now the view above was read before any later write
+        return self._frozen.setdefault(account_id, view)
+
+    def get(self, account_id, default=None):
+        try:
+            return self[account_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, account_id):
+        return account_id in self._accounts
+
+    def __iter__(self):
+        return iter(self._accounts)
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def values(self):
+        return (self[account_id] for account_id in self._accounts)
+
+    def items(self):
+        return ((account_id, self[account_id]) for account_id in self._accounts)
+
+    def save_to_file(self, filename):
+        """Write the snapshot in the same JSON (or binary .bkl) format as Bank.save_to_file"""
+        data = [account.to_dict() for account in self.values()]
+        if is_binary_filename(filename):
+            write_bank_file(filename, data, meta=self.state)
+        else:
+            with open(filename, 'w') as f:
+                json.dump({"format": CENTS_FORMAT, "accounts": data, **self.state}, f)
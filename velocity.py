@@ -0,0 +1,181 @@
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from money import format_money
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Ledger entries that move money out of an account
+OUTGOING_TYPES = ("WITHDRAWAL", "TRANSFER_OUT")
+
+
+class VelocityRule:
+    """Limit on the payments out of one account within a sliding window.
+
+    ``max_count`` caps the number of payments and ``max_amount`` their
+    total in cents; either may be None. ``types`` selects which ledger
+    entry types count. The window slides in ``buckets`` steps, so it is
+    exact to within window / buckets seconds.
+    """
+
+    def __init__(self, name, window, max_count=None, max_amount=None, types=OUTGOING_TYPES, buckets=60):
+        if max_count is None and max_amount is None:
+            raise ValueError("A velocity rule needs a maximum count or amount")
+        if window <= 0:
+            raise ValueError("Window must be positive")
+        self.name = name
+        self.window = window
+        self.max_count = max_count
+        self.max_amount = max_amount
+        self.types = tuple(types)
+        self.buckets = buckets
+        self.bucket_seconds = window / buckets
+
+    def to_dict(self):
+        """Convert the rule to a dictionary for JSON storage"""
+        return {"name": self.name, "window": self.window, "max_count": self.max_count,
+                "max_amount": self.max_amount, "types": list(self.types), "buckets": self.buckets}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a rule from a dictionary produced by to_dict"""
+        return cls(data["name"], data["window"], data.get("max_count"), data.get("max_amount"),
+                   data.get("types", OUTGOING_TYPES), data.get("buckets", 60))
+
+
+class _Counter:
+    """Rolling count and total of one account's payments under one rule"""
+
+    __slots__ = ("buckets", "count", "amount")
+
+    def __init__(self):
+        self.buckets = deque()  # [bucket number, count, amount], oldest first
+        self.count = 0
+        self.amount = 0
+
+    def expire(self, rule, now):
+        oldest = int(now // rule.bucket_seconds) - rule.buckets + 1
+        buckets = self.buckets
+        while buckets and buckets[0][0] < oldest:
+            _, count, amount = buckets.popleft()
+            self.count -= count
+            self.amount -= amount
+
+    def add(self, rule, amount, now):
+        number = int(now // rule.bucket_seconds)
+        buckets = self.buckets
+        if buckets and buckets[-1][0] == number:
+            bucket = buckets[-1]
+            bucket[1] += 1
+            bucket[2] += amount
+        else:
+            buckets.append([number, 1, amount])
+        self.count += 1
+        self.amount += amount
+
+
+class VelocityLimits:
+    """Per-account velocity rules, checked in O(1) per payment.
+
+    Each account keeps one rolling bucketed counter per rule. Counters are
+    built from the account's recent ledger entries the first time the
+    account pays after a load or a rule change, so loading a bank never
+    scans ledgers up front.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self._counters = {}  # account_id -> [_Counter per rule]
+        self._timestamps = {}  # Ledger date string -> Unix time, shared by rebuilds
+        self.dirty = False  # Rules changed since the last save
+
+    def set_rule(self, rule):
+        """Add a rule, replacing any rule with the same name"""
+        self.rules = [existing for existing in self.rules if existing.name != rule.name] + [rule]
+        self._counters.clear()
+        self.dirty = True
+
+    def remove_rule(self, name):
+        """Remove the rule with a given name"""
+        rules = [rule for rule in self.rules if rule.name != name]
+        if len(rules) == len(self.rules):
+            raise ValueError("Velocity rule not found")
+        self.rules = rules
+        self._counters.clear()
+        self.dirty = True
+
+    def forget(self, account_id):
+        """Drop the counters of an account, e.g. one that was closed"""
+        self._counters.pop(account_id, None)
+
+    def _counters_for(self, account, now):
+        counters = self._counters.get(account.id)
+        if counters is None:
+            counters = self._counters[account.id] = self._rebuild(account, now)
+        return counters
+
+    def _rebuild(self, account, now):
+        counters = [_Counter() for _ in self.rules]
+        window = max(rule.window for rule in self.rules)
+        cutoff = (datetime.fromtimestamp(now) - timedelta(seconds=window)).strftime(DATE_FORMAT)
+        entries = account.transactions
+        if account.cold_segments and (not entries or entries[0]["date"] >= cutoff):
+            # The window reaches back past the hot tail
+            entries = account.get_history()
+        recent = []
+        for entry in reversed(entries):
+            if entry["date"] < cutoff:
+                break
+            # Transfers without an ID were memos next to the WITHDRAWAL that moved the money
+            if entry["type"] == "TRANSFER_OUT" and "transfer_id" not in entry:
+                continue
+            recent.append(entry)
+        timestamps = self._timestamps
+        if len(timestamps) > 100000:
+            timestamps.clear()
+        for entry in reversed(recent):
+            timestamp = timestamps.get(entry["date"])
+            if timestamp is None:
+                # Entries posted in the same second share a date, so most lookups hit
+                timestamp = timestamps[entry["date"]] = datetime.strptime(entry["date"], DATE_FORMAT).timestamp()
+            for rule, counter in zip(self.rules, counters):
+                if entry["type"] in rule.types:
+                    counter.add(rule, entry["amount"], timestamp)
+        return counters
+
+    def check(self, account, entry_type, amount, now=None):
+        """Raise ValueError if a payment would break a rule"""
+        if not self.rules:
+            return
+        now = time.time() if now is None else now
+        for rule, counter in zip(self.rules, self._counters_for(account, now)):
+            if entry_type not in rule.types:
+                continue
+            counter.expire(rule, now)
+            if rule.max_count is not None and counter.count + 1 > rule.max_count:
+                raise ValueError(f"Velocity limit '{rule.name}' exceeded: "
+                                 f"at most {rule.max_count} payments per {rule.window / 3600:g} hours")
+            if rule.max_amount is not None and counter.amount + amount > rule.max_amount:
+                raise ValueError(f"Velocity limit '{rule.name}' exceeded: "
+                                 f"at most {format_money(rule.max_amount)} per {rule.window / 3600:g} hours")
+
+    def record(self, account, entry_type, amount, now=None):
+        """Count a payment that was posted"""
+        if not self.rules:
+            return
+        counters = self._counters.get(account.id)
+        if counters is None:
+            return  # Built from the ledger, which already holds this payment, on next use
+        now = time.time() if now is None else now
+        for rule, counter in zip(self.rules, counters):
+            if entry_type in rule.types:
+                counter.add(rule, amount, now)
+
+    def to_list(self):
+        """Convert the rules to a list for JSON storage"""
+        return [rule.to_dict() for rule in self.rules]
+
+    def load(self, rules):
+        """Replace the rules with those in a list produced by to_list"""
+        self.rules = [VelocityRule.from_dict(data) for data in rules]
+        self._counters.clear()
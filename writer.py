@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from money import CENTS_FORMAT
+
+class GroupCommitWriter:
+    """Dedicated journal writer thread with group commit.
+
+    While attached to a bank, every change (postings, new and closed
+    accounts, idempotency results, standing orders) enqueues journal
+    records, grouped per operation. The writer thread appends queued
+    groups to the journal in batches: a batch is committed once
+    ``max_batch`` records are waiting or the oldest has waited
+    ``max_latency`` seconds. A group is never split across commits, so an
+    operation is either replayed whole or not at all. Each commit is one
+    write, plus one fsync when ``fsync`` is set, so larger batches trade
+    commit latency for throughput.
+
+    Posting never waits on the disk. Callers that need durability call
+    wait(), which returns once everything they submitted is committed;
+    they must not hold the bank lock while waiting.
+    """
+
+    def __init__(self, bank, filename="bank.json", max_latency=0.005, max_batch=1000, fsync=True):
+        self.bank = bank
+        self.filename = filename
+        self.max_latency = max_latency
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.error = None  # Exception that stopped the writer, if any
+        self._queue = deque()  # Groups of records, one per operation
+        self._queued = 0  # Records in the queue
+        self._oldest = 0.0  # When the oldest queued group was submitted
+        self._submitted = 0
+        self._committed = 0
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        """Attach to the bank and start the writer thread"""
+        self._thread = threading.Thread(target=self._run, name="BankLite journal writer", daemon=True)
+        self._thread.start()
+        self.bank.writer = self
+
+    def stop(self):
+        """Commit everything queued, then detach from the bank and stop"""
+        if self.bank.writer is self:
+            self.bank.writer = None
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, records):
+        """Queue a list of records to commit together and return its ticket; called under the bank lock"""
+        with self._condition:
+            if not self._queue:
+                self._oldest = time.monotonic()
+                self._condition.notify_all()
+            full = self._queued < self.max_batch <= self._queued + len(records)
+            self._queue.append(records)
+            self._queued += len(records)
+            self._submitted += 1
+            if full:
+                self._condition.notify_all()
+            return self._submitted
+
+    def wait(self, ticket=None, timeout=None):
+        """Block until the group with ``ticket`` (default: everything submitted so far) is committed"""
+        with self._condition:
+            ticket = self._submitted if ticket is None else ticket
+            done = self._condition.wait_for(lambda: self._committed >= ticket or self.error is not None, timeout)
+            if self.error is not None:
+                raise self.error
+            return done
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._queue and not self._stopping:
+                self._condition.wait()
+            # Group commit: let the batch fill until it is full or the oldest record is due
+            while self._queued < self.max_batch and not self._stopping:
+                remaining = self._oldest + self.max_latency - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = []
+            groups = 0
+            # Whole groups only; one larger than max_batch is committed on its own
+            while self._queue and (not batch or len(batch) + len(self._queue[0]) <= self.max_batch):
+                group = self._queue.popleft()
+                batch.extend(group)
+                groups += 1
+            self._queued -= len(batch)
+            self._oldest = time.monotonic()
+            return batch, self._committed + groups
+
+    def _run(self):
+        while True:
+            batch, ticket = self._take_batch()
+            if not batch:
+                return  # Stopping with nothing left to commit
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Fail waiters rather than leave them blocked on a writer that has stopped
+                print(f"Journal write failed: {e}")
+                with self._condition:
+                    self.error = e
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self._committed = ticket
+                self._condition.notify_all()
+
+    def _commit(self, batch):
+        bank = self.bank
+        with bank.lock:
+            # Every operation in the batch has published its events by now, so
+            # a crash can never reuse a sequence number a reader has seen
+            batch.append({"state": {"event_seq": bank.events.last_seq}})
+            limit = bank._journal_limit()
+        # One line per commit: replay drops a torn line whole, never part of a batch
+        data = json.dumps({"format": CENTS_FORMAT, "batch": batch}) + "\n"
+        with bank._save_lock:
+            if any("closed" in record for record in batch):
+                # Closed accounts reach the archive before the journal drops them
+                bank.closed_accounts.flush(self.filename + ".archive")
+            # Reopened for every batch, since a full save removes the journal
+            with open(self.filename + ".journal", "a") as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            bank._journal_records += len(batch)
+            compact = bank._journal_records > limit
+        if compact:
+            bank.save_to_file(self.filename)